@@ -0,0 +1,288 @@
+"""
+Análisis por columnas de registros ``sumo_log.csv`` (``Recorder.export_csv``).
+
+Los CSV se leen por bloques de ``ANALYSIS_CHUNK_ROWS`` filas y cada bloque se
+convierte en columnas ``array('d')`` columna a columna, sin pasar por filas de
+números, así que la memoria no depende del tamaño del archivo.  El esquema se
+detecta por la cabecera: los registros antiguos no tienen ``p1push``/``p2push``
+y las métricas que los necesitan salen como ``None``.
+Opcionalmente las columnas se guardan como archivos binarios ``<col>.f64`` que
+después se abren con ``mmap`` sin volver a parsear el texto.
+
+Uso: ``python analysis.py logs/*.csv [--cache DIR] [--workers N]``
+"""
+import csv, json, math, mmap, os, zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+import constants as C
+
+REQUIRED = ("t", "p1x", "p1y", "p2x", "p2y")
+OPTIONAL = ("p1h", "p2h", "p1ax", "p1ay", "p2ax", "p2ay", "p1push", "p2push")
+
+
+class Schema:
+    """Columnas presentes en un registro y sus posiciones en el CSV."""
+
+    def __init__(self, header):
+        missing = [c for c in REQUIRED if c not in header]
+        if missing:
+            raise ValueError(f"faltan columnas obligatorias: {', '.join(missing)}")
+        self.columns = [c for c in header if c in REQUIRED or c in OPTIONAL]
+        self.index   = {c: header.index(c) for c in self.columns}
+
+    def has(self, *cols):
+        return all(c in self.index for c in cols)
+
+
+# ── Lectura por bloques ──────────────────────────────────────────
+
+def iter_chunks(path, rows=C.ANALYSIS_CHUNK_ROWS):
+    """Produce ``(schema, columnas)`` por bloque; ``columnas`` es ``{nombre: array('d')}``.
+
+    Las filas que no se pueden convertir a número se descartan.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        schema = Schema(next(reader))
+        while True:
+            buf = list(islice(reader, rows))
+            if not buf:
+                return
+            cols = _to_columns(schema, buf)
+            if len(cols["t"]):
+                yield schema, cols
+
+
+def _to_columns(schema, buf):
+    """Convierte un bloque de filas de texto en columnas, una columna cada vez.
+
+    Si alguna fila no es numérica se descartan las filas malas y se repite.
+    """
+    try:
+        return {c: array("d", map(float, map(itemgetter(schema.index[c]), buf)))
+                for c in schema.columns}
+    except (ValueError, IndexError):
+        pass
+    idxs = [schema.index[c] for c in schema.columns]
+    good = []
+    for row in buf:
+        try:
+            for i in idxs:
+                float(row[i])
+        except (ValueError, IndexError):
+            continue
+        good.append(row)
+    return _to_columns(schema, good)
+
+
+# ── Caché en columnas mapeadas en memoria ────────────────────────
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def cache_columns(path, cache_dir):
+    """Convierte ``path`` a archivos de columna en ``cache_dir`` (si no están al día)."""
+    meta_path = os.path.join(cache_dir, "schema.json")
+    stamp = _source_stamp(path)
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f).get("source") == stamp:
+                return cache_dir
+    os.makedirs(cache_dir, exist_ok=True)
+    files, n, schema = {}, 0, None
+    try:
+        for schema, cols in iter_chunks(path):
+            for c, arr in cols.items():
+                if c not in files:
+                    files[c] = open(os.path.join(cache_dir, c + ".f64"), "wb")
+                arr.tofile(files[c])
+            n += len(cols["t"])
+    finally:
+        for fh in files.values():
+            fh.close()
+    meta = {"source": stamp, "rows": n,
+            "columns": schema.columns if schema else list(REQUIRED)}
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return cache_dir
+
+
+def load_columns(cache_dir):
+    """Abre la caché como ``{nombre: memoryview('d')}`` sobre ``mmap``."""
+    with open(os.path.join(cache_dir, "schema.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    cols = {}
+    for c in meta["columns"]:
+        if meta["rows"] == 0:
+            cols[c] = memoryview(array("d"))
+            continue
+        with open(os.path.join(cache_dir, c + ".f64"), "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        cols[c] = memoryview(mm).cast("d")
+    return meta, cols
+
+
+def iter_cached_chunks(cache_dir, rows=C.ANALYSIS_CHUNK_ROWS):
+    """Como ``iter_chunks`` pero leyendo de la caché (sin copiar)."""
+    meta, cols = load_columns(cache_dir)
+    schema = Schema(meta["columns"])
+    for a in range(0, meta["rows"], rows):
+        yield schema, {c: mv[a:a+rows] for c, mv in cols.items()}
+
+
+# ── Métricas ─────────────────────────────────────────────────────
+
+class _BotAcc:
+    """Acumuladores por bot dentro de una partida."""
+
+    __slots__ = ("peak_a", "edge_min", "edge_sum", "near_edge_ms",
+                 "reversals", "turn_deg", "pushes", "prev_h", "prev_sign",
+                 "prev_push")
+
+    def __init__(self, with_push):
+        self.peak_a = 0.0
+        self.edge_min = math.inf
+        self.edge_sum = 0.0
+        self.near_edge_ms = 0.0
+        self.reversals = 0
+        self.turn_deg = 0.0
+        self.pushes = 0 if with_push else None
+        self.prev_h = None
+        self.prev_sign = 0
+        self.prev_push = None
+
+    def feed(self, dt, x, y, h, a, push):
+        cx, cy = C.CENTER
+        edge = (C.DOJO_RADIUS - math.hypot(x - cx, y - cy)) / C.PX_PER_CM
+        if edge < self.edge_min:
+            self.edge_min = edge
+        self.edge_sum += edge
+        # fuera del dojo (borde negativo) no cuenta como "cerca del borde"
+        if 0 <= edge < C.ANALYSIS_EDGE_NEAR_CM:
+            self.near_edge_ms += dt
+        if push is not None:
+            # contador acumulado del simulador (``Bot.pushes``)
+            if self.prev_push is not None and push > self.prev_push:
+                self.pushes += int(push - self.prev_push)
+            self.prev_push = push
+        if a is not None and a > self.peak_a:
+            self.peak_a = a
+        if h is None:
+            return
+        if self.prev_h is not None:
+            dh = (h - self.prev_h + 540) % 360 - 180
+            if dh:
+                sign = 1 if dh > 0 else -1
+                if self.prev_sign and sign != self.prev_sign:
+                    self.reversals += 1
+                self.prev_sign = sign
+                self.turn_deg += abs(dh)
+        self.prev_h = h
+
+    def result(self, prefix, frames):
+        return {
+            prefix + "peak_a":         self.peak_a,
+            prefix + "edge_min_cm":    self.edge_min,
+            prefix + "edge_mean_cm":   self.edge_sum / frames if frames else math.nan,
+            prefix + "near_edge_ms":   self.near_edge_ms,
+            prefix + "heading_reversals": self.reversals,
+            prefix + "turn_deg":       self.turn_deg,
+            prefix + "pushes":         self.pushes,
+        }
+
+
+class _MatchAcc:
+    """Métricas de una partida (tramo con ``t`` creciente)."""
+
+    def __init__(self, schema):
+        self.t0 = self.t1 = None
+        self.frames = 0
+        self.contact_ms = 0.0
+        self.bots = (_BotAcc(schema.has("p1push")), _BotAcc(schema.has("p2push")))
+
+    def result(self, source, idx):
+        res = {"file": source, "match": idx, "t_start": self.t0,
+               "duration_ms": self.t1 - self.t0, "frames": self.frames,
+               "contact_ms": self.contact_ms}
+        res.update(self.bots[0].result("p1_", self.frames))
+        res.update(self.bots[1].result("p2_", self.frames))
+        return res
+
+
+def _col(cols, name, n):
+    """Columna ``name`` o una secuencia de ``None`` si el esquema no la tiene."""
+    return cols[name] if name in cols else (None,) * n
+
+
+def _magnitudes(cols, ax, ay, n):
+    if ax in cols and ay in cols:
+        return [math.hypot(a, b) for a, b in zip(cols[ax], cols[ay])]
+    return (None,) * n
+
+
+def analyze_chunks(chunks, source=""):
+    """Calcula las métricas de cada partida de una secuencia de bloques.
+
+    Una partida nueva empieza cuando ``t`` retrocede (el ``Recorder`` se
+    vacía al reiniciar).
+    """
+    results, acc, prev_t = [], None, None
+    contact2 = (2 * C.BOT_RADIUS) ** 2
+    for schema, cols in chunks:
+        n = len(cols["t"])
+        rows = zip(cols["t"], cols["p1x"], cols["p1y"], cols["p2x"], cols["p2y"],
+                   _col(cols, "p1h", n), _col(cols, "p2h", n),
+                   _magnitudes(cols, "p1ax", "p1ay", n),
+                   _magnitudes(cols, "p2ax", "p2ay", n),
+                   _col(cols, "p1push", n), _col(cols, "p2push", n))
+        for t, x1, y1, x2, y2, h1, h2, a1, a2, n1, n2 in rows:
+            if acc is None or t < prev_t:
+                if acc is not None:
+                    results.append(acc.result(source, len(results)))
+                acc = _MatchAcc(schema)
+                acc.t0, prev_t = t, t
+            dt = t - prev_t
+            prev_t = acc.t1 = t
+            acc.frames += 1
+            if (x1 - x2)**2 + (y1 - y2)**2 <= contact2:
+                acc.contact_ms += dt
+            acc.bots[0].feed(dt, x1, y1, h1, a1, n1)
+            acc.bots[1].feed(dt, x2, y2, h2, a2, n2)
+    if acc is not None:
+        results.append(acc.result(source, len(results)))
+    return results
+
+
+def analyze_file(path, cache_root=None):
+    """Métricas por partida de un registro, usando la caché si se indica."""
+    if cache_root is None:
+        return analyze_chunks(iter_chunks(path), path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    key = zlib.crc32(os.path.abspath(path).encode("utf-8"))
+    cache_dir = os.path.join(cache_root, f"{name}-{key:08x}")
+    cache_columns(path, cache_dir)
+    return analyze_chunks(iter_cached_chunks(cache_dir), path)
+
+
+def analyze(paths, cache_root=None, workers=None):
+    """Analiza varios registros en paralelo (un proceso por archivo)."""
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futs = [ex.submit(analyze_file, p, cache_root) for p in paths]
+        return [r for f in futs for r in f.result()]
+
+
+if __name__ == "__main__":
+    import argparse, sys
+    ap = argparse.ArgumentParser(description="Métricas por partida de registros CSV.")
+    ap.add_argument("logs", nargs="+")
+    ap.add_argument("--cache", default=None, help="directorio para columnas mmap")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+    res = analyze(args.logs, args.cache, args.workers)
+    if res:
+        w = csv.DictWriter(sys.stdout, fieldnames=res[0].keys())
+        w.writeheader(); w.writerows(res)
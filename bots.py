@@ -7,6 +7,7 @@ from pygame.math import Vector2
 import constants as C
 import utils as U
 from gyroscope import GyroscopeSimulated
+from sensors import sense
 
 class Ping:
     """Representa un pulso ultrasónico y su eco de retorno."""
@@ -63,10 +64,13 @@ class Bot:
         self.prev_heading = 0.0
 
         self.gyroscope = GyroscopeSimulated()
+        self.imu = None                 # ImuSimulated opcional (alta frecuencia)
+        self.sensors = None             # SensorFrame del último tick
         self.ir_intensity = 0.0
         self.ir_rho       = C.IR_RHO_BLACK
         self.ir_dist_cm   = 0.0
         self.ir_colour    = "negro"
+        self.pushes       = 0
 
         # Estado de la batería: los robots empiezan con carga alta aleatoria
         self.battery = random.uniform(C.BATTERY_INITIAL_MIN, 100.0)
@@ -111,7 +115,7 @@ class Bot:
         dv = self.vel - self.prev_vel
         ax = (dv.x) / (dt_ms/1000.0)
         ay = (dv.y) / (dt_ms/1000.0)
-        ax *= 0.0025; ay *= 0.0025
+        ax *= C.ACCEL_PX_TO_MSS; ay *= C.ACCEL_PX_TO_MSS
         self.accel = (ax, ay)
         self.accel_time = pygame.time.get_ticks()
         self.prev_vel = self.vel
@@ -148,33 +152,24 @@ class Bot:
         Devuelve una tupla ``(medida, real, hit_pt, src)`` donde ``medida`` es la
         distancia perturbada aleatoriamente y ``real`` la distancia exacta.
         """
-        dv = U.unit_vec(self.heading_deg)
-        d_ring = U.ray_circle((self.pos.x, self.pos.y), dv)
-        d_bot  = None
-        if opponent is not None:
-            d_bot = U.ray_disc((self.pos.x, self.pos.y), dv,
-                               (opponent.pos.x, opponent.pos.y), C.BOT_RADIUS)
-        if d_bot is not None and d_bot < d_ring and d_bot <= C.MAX_RANGE_PX:
-            real = d_bot
-            hit_pt = (self.pos.x + dv[0]*real,
-                      self.pos.y + dv[1]*real)
-            src = "bot"
-        else:
-            real = min(d_ring, C.MAX_RANGE_PX)
-            hit_pt = (self.pos.x + dv[0]*real,
-                      self.pos.y + dv[1]*real)
-            src = "ring"
-        if noisy:
-            noise = random.uniform(-C.PING_NOISE_PX, C.PING_NOISE_PX)
-            measured = max(0.0, real + noise)
-        else:
-            measured = real
+        target = None if opponent is None else (opponent.pos.x, opponent.pos.y)
+        real, hit_pt, src = U.sonar_trace((self.pos.x, self.pos.y),
+                                          self.heading_deg, target)
+        measured = U.sonar_measure(real) if noisy else real
         return measured, real, hit_pt, src
 
     def launch_ping(self, now_ms, opponent=None):
-        """Lanza un nuevo ping si ha pasado el tiempo de recarga."""
+        """Lanza un nuevo ping si ha pasado el tiempo de recarga.
+
+        Usa el trazado del ``SensorFrame`` del tick si existe (solo se
+        calcula aquí, al lanzar, o si el HUD lo pide).
+        """
         if self.ping is None and now_ms - self.last_ping_ms >= C.PING_PERIOD_MS:
-            _, dist, hit_pt, src = self._compute_ping_hit(opponent, noisy=False)
+            s = self.sensors
+            if s is not None:
+                dist, hit_pt, src = s.sonar_real_px, s.sonar_hit, s.sonar_src
+            else:
+                _, dist, hit_pt, src = self._compute_ping_hit(opponent, noisy=False)
             self.ping = Ping((self.pos.x, self.pos.y),
                              math.radians(self.heading_deg),
                              dist, hit_pt, src)
@@ -185,10 +180,11 @@ class Bot:
         if self.ping and not self.ping.update(dt_ms):
             self.ping = None
     
-    def detectar_Empuje(self, umbral_giro = 40.0):
+    def detectar_Empuje(self, umbral_giro = C.PUSH_GYRO_DEG_S):
         vel_vang = self.gyroscope.read_angular_velocity()
         if abs(vel_vang) > umbral_giro and self.ang_vel == 0:
             print(f"[{self.colour}] Empujón Detectado, velocidad angular: {vel_vang:.2f}°/s")
+            self.pushes += 1
             return True
         return False
     
@@ -239,22 +235,24 @@ class CpuBot(Bot):
         self.state = "scan"
         self.scan_rot = 0.0
         self.move_time = 0
+        self.scan_cycles = 0
 
     def update(self, target_bot, dt_ms):
-        """IA basada en estados: escaneo, movimiento y persecución."""
-        now_ms = pygame.time.get_ticks()
+        """IA basada en estados: escaneo, movimiento y persecución.
+
+        Las decisiones se toman con ``self.sensors`` (lecturas del último tick);
+        los pings los lanza y propaga ``Match.step`` una vez por tick.
+        """
+        s = self.sensors
+        if s is None:
+            s = self.sensors = sense(self, target_bot, 0)
 
         if self.state == "scan":
             # detección básica dentro del campo de visión del sonar antes de girar
-            dx = target_bot.pos.x - self.pos.x
-            dy = target_bot.pos.y - self.pos.y
-            dist = math.hypot(dx, dy)
-            if dist <= C.MAX_RANGE_PX:
-                ang_to = math.degrees(math.atan2(dy, dx)) % 360
-                diff = (ang_to - self.heading_deg + 540) % 360 - 180
-                if abs(diff) <= C.FOV_DEG / 2:
+            if s.opp_dist <= C.MAX_RANGE_PX:
+                if abs(s.opp_diff) <= C.FOV_DEG / 2:
                     self.state = "pursue"
-                    self.heading_deg = ang_to
+                    self.heading_deg = s.opp_bearing
                     self.scan_rot = 0
                     self.vel.xy = (0.0, 0.0)
                     self.record_ang_vel(0)
@@ -267,12 +265,11 @@ class CpuBot(Bot):
 
             self.record_ang_vel(dt_ms)
             self.vel.xy = (0.0, 0.0)
-            self.launch_ping(now_ms, target_bot)
-            self.update_ping(dt_ms)
 
             self.scan_rot += abs(turn)
             self.record_accel(dt_ms)
             if self.scan_rot >= 360:
+                self.scan_cycles += 1
                 self.state = "move"
                 self.move_time = 0
                 self.scan_rot = 0
@@ -293,8 +290,7 @@ class CpuBot(Bot):
             self.record_ang_vel(dt_ms)
             prev_pos = self.pos.copy()
             self.integrate(dt_ms)
-            self.update_ir()
-            if self.ir_colour == "blanco" or not U.within_ring_with_radius(self.pos):
+            if U.on_white_line(self.pos) or not U.within_ring_with_radius(self.pos):
                 # el sensor ha encontrado el borde o se salió del dojo: retrocede y reinicia paso
                 self.pos = prev_pos
                 self.heading_deg = (self.heading_deg + 180) % 360
@@ -308,6 +304,14 @@ class CpuBot(Bot):
                 self.state = "scan"
                 self.vel.xy = (0.0, 0.0)
 
+        elif self.state == "pursue" and (s.opp_dist > C.MAX_RANGE_PX or
+                                         abs(s.opp_diff) > C.FOV_DEG / 2):
+            # ha perdido al rival: vuelve a escanear
+            self.state = "scan"
+            self.vel.xy = (0.0, 0.0)
+            self.record_ang_vel(dt_ms)
+            self.record_accel(dt_ms)
+
         elif self.state == "pursue":
             # se desplaza hacia delante con rumbo fijo
             vx, vy = U.unit_vec(self.heading_deg)
@@ -319,8 +323,7 @@ class CpuBot(Bot):
             self.record_ang_vel(dt_ms)
             prev_pos = self.pos.copy()
             self.integrate(dt_ms)
-            self.update_ir()
-            if self.ir_colour == "blanco" or not U.within_ring_with_radius(self.pos):
+            if U.on_white_line(self.pos) or not U.within_ring_with_radius(self.pos):
                 # si detecta el borde o se salió del dojo, retrocede y vuelve a escanear
                 self.pos = prev_pos
                 self.heading_deg = (self.heading_deg + 180) % 360
@@ -329,18 +332,6 @@ class CpuBot(Bot):
                 self.move_time = 0
 
             self.record_accel(dt_ms)
-            self.launch_ping(now_ms, target_bot)
-            self.update_ping(dt_ms)
-
-            if self.state == "pursue":
-                dx = target_bot.pos.x - self.pos.x
-                dy = target_bot.pos.y - self.pos.y
-                dist = math.hypot(dx, dy)
-                ang_to = math.degrees(math.atan2(dy, dx)) % 360
-                diff = (ang_to - self.heading_deg + 540) % 360 - 180
-                if dist > C.MAX_RANGE_PX or abs(diff) > C.FOV_DEG / 2:
-                    self.state = "scan"
-                    self.vel.xy = (0.0, 0.0)
 
         if self.detectar_Empuje():
             print("[CPUBot] Empujón Detectado, reposicionado...")
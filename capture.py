@@ -0,0 +1,155 @@
+"""
+Captura de frames a disco en segundo plano para exportar vídeo.
+
+Formatos:
+  * ``raw``: flujo RGB24 sin cabecera en un único archivo; se convierte con
+    ``ffmpeg -f rawvideo -pix_fmt rgb24 -s 900x700 -r 60 -i captura.rgb out.mp4``.
+    Es el único formato en vivo: escribir bytes apenas retiene el GIL.
+  * ``png``: secuencia ``frame_000000.png`` dentro del directorio indicado,
+    solo al exportar sin ventana.  Comprimir PNG retiene el GIL, así que se
+    codifica en procesos aparte (``CAPTURE_PNG_WORKERS``).
+"""
+import os, queue, threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+import constants as C
+
+
+def _save_png(data, size, filename):
+    """Codifica un frame RGB24 en ``filename`` (se ejecuta en otro proceso)."""
+    pygame.image.save(pygame.image.frombytes(data, size, "RGB"), filename)
+
+
+class FrameCapture:
+    """Copia frames de una superficie y los escribe desde un hilo aparte.
+
+    La cola está acotada a ``max_queue`` frames, así que la memoria nunca pasa
+    de ``max_queue`` copias de la pantalla.  En vivo (``block=False``) los
+    frames que no caben se descartan en lugar de frenar el juego; al exportar
+    sin ventana (``block=True``) se espera a que el escritor libere sitio.
+    """
+
+    def __init__(self, path, fmt="raw", max_queue=C.CAPTURE_QUEUE, block=False,
+                 workers=C.CAPTURE_PNG_WORKERS):
+        """Prepara ``path`` (directorio para PNG, archivo para raw) y arranca el hilo."""
+        if fmt not in ("png", "raw"):
+            raise ValueError(f"formato de captura desconocido: {fmt}")
+        if fmt == "png" and not block:
+            raise ValueError("la captura PNG solo está disponible al exportar")
+        self.path    = path
+        self.fmt     = fmt
+        self.block   = block
+        self.count   = 0
+        self.dropped = 0
+        self.size    = None
+        self.error   = None     # excepción que detuvo al hilo escritor
+        if fmt == "png":
+            os.makedirs(path, exist_ok=True)
+        self.max_queue = max_queue
+        self.workers   = workers
+        self._q = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def capture(self, surf):
+        """Encola una copia de ``surf``; devuelve ``False`` si se descartó."""
+        if self.size is None:
+            self.size = surf.get_size()
+        elif surf.get_size() != self.size:
+            raise ValueError("todas las capturas deben tener el mismo tamaño")
+        self._check()
+        if not self.block and self._q.full():
+            self.dropped += 1
+            return False
+        item = (self.count, pygame.image.tobytes(surf, "RGB"))
+        if not self._put(item, self.block):
+            self._check()
+            self.dropped += 1
+            return False
+        self.count += 1
+        return True
+
+    def close(self):
+        """Espera a que se escriban los frames pendientes y cierra el archivo.
+
+        Si el hilo escritor falló, relanza su excepción.
+        """
+        self._put(None, True)
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        """Relanza el error del hilo escritor, si lo hubo."""
+        if self.error is not None:
+            raise self.error
+
+    def _put(self, item, block):
+        """Encola ``item``; si ``block``, espera mientras el escritor siga vivo."""
+        while True:
+            try:
+                self._q.put(item, timeout=0.1 if block else None, block=block)
+                return True
+            except queue.Full:
+                if not block or not self._thread.is_alive():
+                    return False
+
+    def _worker(self):
+        """Bucle del hilo escritor; guarda en ``error`` lo que lo detenga."""
+        try:
+            if self.fmt == "raw":
+                self._write_raw()
+            else:
+                self._write_png()
+        except Exception as exc:
+            self.error = exc
+
+    def _write_raw(self):
+        with open(self.path, "wb") as out:
+            while True:
+                item = self._q.get()
+                if item is None:
+                    break
+                out.write(item[1])
+
+    def _write_png(self):
+        """Reparte los frames entre procesos; como mucho ``max_queue`` en curso.
+
+        Con una sola CPU no hay en qué repartir: se codifica en este hilo y
+        se ahorra copiar cada frame por la tubería.
+        """
+        workers = self.workers or os.cpu_count() or 1
+        ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        pending = deque()
+        try:
+            while True:
+                item = self._q.get()
+                if item is None:
+                    break
+                idx, data = item
+                name = os.path.join(self.path, f"frame_{idx:06d}.png")
+                if ex is None:
+                    _save_png(data, self.size, name)
+                    continue
+                pending.append(ex.submit(_save_png, data, self.size, name))
+                if len(pending) >= self.max_queue:
+                    pending.popleft().result()
+            while pending:
+                pending.popleft().result()
+        finally:
+            if ex is not None:
+                ex.shutdown()
+
+if __name__ == "__main__":
+    import argparse
+    from game import SumoSensorsGame
+    ap = argparse.ArgumentParser(description="Exporta un replay CSV a frames sin ventana.")
+    ap.add_argument("csv")
+    ap.add_argument("out")
+    ap.add_argument("--format", choices=("raw", "png"), default="raw")
+    ap.add_argument("--mode", default="player_cpu",
+                    choices=("player_cpu", "two_players", "cpu_cpu"))
+    args = ap.parse_args()
+    n = SumoSensorsGame(headless=True).export_replay(args.csv, args.out,
+                                                     args.format, args.mode)
+    print(f"{n} frames exportados a {args.out}")
@@ -31,25 +31,63 @@ MAX_SPEED           = 260.0
 CPU_SPEED           = 150.0
 DAMPING_PER_FRAME   = 0.93
 TIME_SCALE          = 0.5
+SIM_DT_MS           = 1000 / 60 * TIME_SCALE   # paso fijo sin ventana (ms)
+SIM_RATE_HZ         = 120        # pasos por segundo real en modo con hilos
+SIM_MAX_CATCHUP     = 8          # pasos seguidos máximos para recuperar retraso
 
 # ── Batería ──────────────────────────────────────────────────────
 BATTERY_INITIAL_MIN = 80.0              # porcentaje mínimo de arranque
 BATTERY_DRAIN_BASE  = 0.005             # % por segundo en reposo
 BATTERY_DRAIN_SPEED = 0.05              # % extra por segundo a máxima velocidad
 
+# ── Reglas de combate (tiempo simulado) ─────────────────────────
+MATCH_TIME_LIMIT_MS = 180_000           # duración máxima → "timeout"
+NO_CONTACT_LIMIT_MS = 30_000            # sin tocarse → empate
+STALL_SCAN_CYCLES   = 8                 # barridos CPU seguidos lejos del rival → empate
+PUSH_GYRO_DEG_S     = 40.0              # umbral de giro para detectar empujones
 
 FOV_DEG        = 60
 CREST_GAP_PX   = 35
 PING_PERIOD_MS = 700
 # alcance máximo del sensor ultrasónico (≃30 cm)
 MAX_RANGE_PX   = int(30 * PX_PER_CM)
+STALL_FAR_PX   = MAX_RANGE_PX            # "lejos" para el empate sin progreso
 PING_NOISE_PX  = 0
 PING_NOISE_RANGE = (0, 40)
 
 
 ACCEL_DISPLAY_MS = 600
 G_MSS = 9.81
-
+ACCEL_PX_TO_MSS = 0.0025                # escala px s-2 → "m/s²" del acelerómetro
+
+# ── IMU de alta frecuencia ───────────────────────────────────────
+IMU_RATE_HZ     = 1000.0                # muestras por segundo simulado
+IMU_BUFFER      = 4096                  # capacidad del buffer circular por bot
+IMU_ACCEL_NOISE = 0.05                  # desviación típica (m/s²)
+IMU_GYRO_NOISE  = 0.5                   # desviación típica (°/s)
+IMU_ACCEL_BIAS  = 0.02                  # sesgo constante (m/s²)
+IMU_GYRO_BIAS   = 0.3                   # sesgo constante (°/s)
+
+# ── Captura de vídeo ─────────────────────────────────────────────
+CAPTURE_QUEUE       = 32                # frames máximos pendientes de escribir
+CAPTURE_PNG_WORKERS = None              # procesos que codifican PNG (None = nº de CPUs)
+
+# ── Vista en cuadrícula ──────────────────────────────────────────
+GRID_REFRESH_MS      = 100.0            # periodo de refresco de cada miniatura
+GRID_TILES_PER_FRAME = 12               # miniaturas redibujadas como máximo por frame
+GRID_GAP             = 4                # separación entre miniaturas (px)
+GRID_RESTART_MS      = 1500             # pausa antes de reiniciar una partida acabada
+
+# ── Telemetría en vivo ───────────────────────────────────────────
+TELEMETRY_PORT        = 47800           # puerto TCP local por defecto
+TELEMETRY_DECIMATION  = 2               # publica 1 de cada N frames
+TELEMETRY_BATCH       = 30              # frames por mensaje
+TELEMETRY_MAX_PENDING = 64              # mensajes en cola por suscriptor
+TELEMETRY_FLUSH_MS    = 100             # espera máxima de un lote a medio llenar
+
+# ── Análisis de registros ────────────────────────────────────────
+ANALYSIS_CHUNK_ROWS = 16384             # filas por bloque al leer CSV
+ANALYSIS_EDGE_NEAR_CM = 10.0            # "cerca del borde": centro a menos de esto del borde
 
 GREY_BG   = (225, 225, 225)
 
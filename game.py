@@ -1,10 +1,13 @@
-import sys, pygame
+import sys, time, pygame
 from pygame import gfxdraw
 import constants as C
 import utils as U
-import bots as B
 import math
 from recorder import Recorder
+from match import Match, OUTCOME_KO
+from capture import FrameCapture
+import snapshot
+from simthread import SimThread
 
 pygame.init()
 FONT  = pygame.font.SysFont(None, 28)
@@ -13,47 +16,95 @@ SMALL = pygame.font.SysFont(None, 20)
 class SumoSensorsGame:
     """Encapsula el estado y la lógica principal del simulador."""
 
-    def __init__(self):
-        self.scr   = pygame.display.set_mode((C.SCREEN_W, C.SCREEN_H))
-        pygame.display.set_caption("Sumo-Sensors (modular)")
+    def __init__(self, headless=False, telemetry=None):
+        self.headless = headless
+        self.telemetry = telemetry   # TelemetryPublisher opcional
+        if headless:
+            # render a una superficie fuera de pantalla (exportación sin ventana)
+            self.scr = pygame.Surface((C.SCREEN_W, C.SCREEN_H))
+        else:
+            self.scr = pygame.display.set_mode((C.SCREEN_W, C.SCREEN_H))
+            pygame.display.set_caption("Sumo-Sensors (modular)")
         self.clock = pygame.time.Clock()
         self.background = self._make_background()
-        self.mode = "player_cpu"  # modos: player_cpu, two_players, cpu_cpu
         self.replay_mode = False
         self.rec   = Recorder()
+        self.capture = None
+        self.snapshot = None
+        # modos: player_cpu, two_players, cpu_cpu
+        self.match = Match("player_cpu", recorder=self.rec)
         self.reset()
 
     def reset(self):
-        if self.mode == "player_cpu":
-            self.player = B.PlayerBot((C.CENTER[0]-120, C.CENTER[1]), C.PLAYER_C)
-            self.opponent = B.CpuBot((C.CENTER[0]+120, C.CENTER[1]), C.CPU_C)
-        elif self.mode == "two_players":
-            self.player = B.PlayerBot((C.CENTER[0]-120, C.CENTER[1]), C.PLAYER_C)
-            self.opponent = B.Player2Bot((C.CENTER[0]+120, C.CENTER[1]), C.P2_C)
-        else:  # cpu_cpu
-            self.player = B.CpuBot((C.CENTER[0]-120, C.CENTER[1]), C.CPU_C)
-            self.opponent = B.CpuBot((C.CENTER[0]+120, C.CENTER[1]), C.P2_C)
-
-        self.player.heading_deg = 0
-        self.player.prev_heading = 0
-        self.opponent.heading_deg = 180
-        self.opponent.prev_heading = 180
-        self.game_over = False
-        self.winner    = ""
+        self.match.reset()
         self.replay_mode = False
         self.replay_idx  = 0
-        self.rec.frames.clear()
-        self.player.update_ir()
-        self.opponent.update_ir()
+
     def cycle_mode(self):
         modes = ["player_cpu", "two_players", "cpu_cpu"]
-        self.mode = modes[(modes.index(self.mode) + 1) % len(modes)]
+        self.match.mode = modes[(modes.index(self.match.mode) + 1) % len(modes)]
         self.reset()
 
     def start_replay(self):
         self.replay_mode = bool(self.rec.frames)
         self.replay_idx = 0
 
+    def export_csv(self):
+        # se exporta una copia: en modo con hilos la simulación sigue grabando
+        ok = self.rec.export_csv(frames=list(self.rec.frames))
+        print("CSV guardado" if ok else "Nada que exportar")
+
+    def save_snapshot(self):
+        self.snapshot = snapshot.take(self.match)
+        print(f"Instantánea guardada ({len(self.snapshot)} bytes)")
+
+    def load_snapshot(self):
+        if self.snapshot is not None:
+            self.match = snapshot.restore(self.snapshot, self.match)
+            self.replay_mode = False
+
+    def toggle_capture(self):
+        """Activa o detiene la captura de vídeo de la partida en vivo."""
+        if self.capture is None:
+            name = time.strftime("captura_%Y%m%d_%H%M%S.rgb")
+            self.capture = FrameCapture(name)
+            print(f"Capturando en {name}")
+        else:
+            cap, self.capture = self.capture, None
+            try:
+                cap.close()
+            except (OSError, pygame.error) as exc:
+                print(f"Captura interrumpida: {exc}")
+                return
+            print(f"Captura terminada: {cap.count} frames "
+                  f"({cap.dropped} descartados)")
+
+    def export_replay(self, csv_path, out_path, fmt="raw", mode="player_cpu"):
+        """Renderiza un replay CSV a disco tan rápido como se pueda escribir."""
+        self.match.mode = mode
+        self.reset()
+        self.rec.load_csv(csv_path)
+        cap = self.capture = FrameCapture(out_path, fmt, block=True)
+        try:
+            for self.replay_idx in range(len(self.rec.frames)):
+                self.draw_replay()
+        finally:
+            cap.close()
+            self.capture = None
+        return cap.count
+
+    def _present(self):
+        """Entrega el frame dibujado a la captura y a la pantalla."""
+        if self.capture is not None:
+            try:
+                self.capture.capture(self.scr)
+            except (OSError, pygame.error):
+                if self.headless:
+                    raise
+                self.toggle_capture()       # informa del error y la detiene
+        if not self.headless:
+            pygame.display.flip()
+
     def _make_background(self):
         surf = pygame.Surface((C.SCREEN_W, C.SCREEN_H))
         top, bottom = C.BG_TOP_C, C.BG_BOTTOM_C
@@ -65,14 +116,16 @@ class SumoSensorsGame:
             pygame.draw.line(surf, (r, g, b), (0, y), (C.SCREEN_W, y))
         return surf
 
-    def _ring(self):
+    def _ring(self, surf=None):
+        """Dibuja el dojo en ``surf`` (por defecto, la pantalla)."""
+        surf = self.scr if surf is None else surf
         outer_radius = C.DOJO_RADIUS + C.RING_EDGE + C.OUTER_RING_WIDTH
-        gfxdraw.filled_circle(self.scr, C.CENTER[0], C.CENTER[1], outer_radius, C.RING_FILL)
-        gfxdraw.aacircle(self.scr, C.CENTER[0], C.CENTER[1], outer_radius, C.RING_FILL)
-        pygame.draw.circle(self.scr, C.RING_EDGE_C, C.CENTER, C.DOJO_RADIUS, C.RING_EDGE)
-        gfxdraw.aacircle(self.scr, C.CENTER[0], C.CENTER[1], C.DOJO_RADIUS, C.RING_EDGE_C)
-        gfxdraw.filled_circle(self.scr, C.CENTER[0], C.CENTER[1], C.CENTER_MARK_RADIUS, C.CENTER_MARK_C)
-        gfxdraw.aacircle(self.scr, C.CENTER[0], C.CENTER[1], C.CENTER_MARK_RADIUS, C.CENTER_MARK_C)
+        gfxdraw.filled_circle(surf, C.CENTER[0], C.CENTER[1], outer_radius, C.RING_FILL)
+        gfxdraw.aacircle(surf, C.CENTER[0], C.CENTER[1], outer_radius, C.RING_FILL)
+        pygame.draw.circle(surf, C.RING_EDGE_C, C.CENTER, C.DOJO_RADIUS, C.RING_EDGE)
+        gfxdraw.aacircle(surf, C.CENTER[0], C.CENTER[1], C.DOJO_RADIUS, C.RING_EDGE_C)
+        gfxdraw.filled_circle(surf, C.CENTER[0], C.CENTER[1], C.CENTER_MARK_RADIUS, C.CENTER_MARK_C)
+        gfxdraw.aacircle(surf, C.CENTER[0], C.CENTER[1], C.CENTER_MARK_RADIUS, C.CENTER_MARK_C)
 
     def _draw_bot(self, bot):
         x, y = int(bot.pos.x), int(bot.pos.y)
@@ -124,13 +177,13 @@ class SumoSensorsGame:
                             arc-half, arc+half, 2)
 
     def _draw_hud(self, bot, opponent, align_left=True):
-        dist_px, real_px, _, _ = bot._compute_ping_hit(opponent)
-        dist_cm = dist_px / C.PX_PER_CM
-        real_cm = real_px / C.PX_PER_CM
+        s = bot.sensors
+        dist_cm = s.sonar_px / C.PX_PER_CM
+        real_cm = s.sonar_real_px / C.PX_PER_CM
         tof_ms  = (2 * dist_cm) / C.V_SOUND_CMMS
-        ax, ay  = bot.accel
-        amag    = math.hypot(ax, ay)
-        gyro    = bot.gyroscope.read_angular_velocity()
+        ax, ay  = s.accel
+        amag    = s.accel_mag
+        gyro    = s.gyro
 
         label_pos = None
         if amag > 0:
@@ -159,15 +212,15 @@ class SumoSensorsGame:
             "",
             "Velocidad angular:",
             "ω = Δθ / Δt",
-            f"ω = {bot.ang_vel:6.2f} °/s",
+            f"ω = {s.ang_vel:6.2f} °/s",
             f"ω (giroscopio) = {gyro:6.2f} °/s",
             "",  # Espacio extra antes del sensor IR
             "Sensor IR:",
             "I = P · ρ / d²",
             f"d = {C.IR_SENSOR_HEIGHT_CM:6.1f} cm",
-            f"ρ = {bot.ir_rho:4.2f}",
-            f"I = {bot.ir_intensity:6.2f}",
-            f"color = {bot.ir_colour}",
+            f"ρ = {s.ir_rho:4.2f}",
+            f"I = {s.ir_intensity:6.2f}",
+            f"color = {s.ir_colour}",
         ]
 
         for i, line in enumerate(lines):
@@ -182,26 +235,33 @@ class SumoSensorsGame:
             tag = SMALL.render(f"|a|={amag:4.2f}", True, C.ACCEL_VEC_C)
             self.scr.blit(tag, (label_pos[0] + 5, label_pos[1] - 10))
 
-    def draw_game(self, now):
-        """Renderiza el estado del juego durante una partida normal."""
+    def draw_game(self, now, match=None):
+        """Renderiza el estado del juego durante una partida normal.
+
+        ``match`` permite dibujar una vista publicada por ``SimThread``.
+        """
+        m = self.match if match is None else match
         self.scr.blit(self.background, (0,0))
 
         self._ring()
-        for b in (self.player, self.opponent):
+        for b in (m.player, m.opponent):
             self._draw_bot(b)
             self._draw_pings(b)
 
-        self._draw_hud(self.player, self.opponent, align_left=True)
-        self._draw_hud(self.opponent, self.player, align_left=False)
+        self._draw_hud(m.player, m.opponent, align_left=True)
+        self._draw_hud(m.opponent, m.player, align_left=False)
 
-        help1 = "ESC salir  |  R reiniciar  |  TAB modo  |  T replay  |  C CSV"
+        help1 = "ESC salir  |  R reiniciar  |  TAB modo  |  T replay  |  C CSV  |  V vídeo  |  F5/F9 instantánea"
         self.scr.blit(SMALL.render(help1, True, C.TXT_C), (10, C.SCREEN_H-40))
 
-        if self.game_over:
-            msg = FONT.render(f"¡GANA {self.winner}! (R para reiniciar)",
-                              True, C.IMPACT_C)
+        if m.game_over:
+            if m.outcome == OUTCOME_KO:
+                text = f"¡GANA {m.winner}! (R para reiniciar)"
+            else:
+                text = f"EMPATE: {m.reason} (R para reiniciar)"
+            msg = FONT.render(text, True, C.IMPACT_C)
             self.scr.blit(msg, (C.SCREEN_W//2 - msg.get_width()//2, 30))
-        pygame.display.flip()
+        self._present()
 
     def draw_replay(self):
         """Dibuja el modo de repetición de una partida grabada."""
@@ -210,9 +270,9 @@ class SumoSensorsGame:
         fr = self.rec.frames[self.replay_idx]
         p1 = (fr["p1x"], fr["p1y"])
         p2 = (fr["p2x"], fr["p2y"])
-        if self.mode == "player_cpu":
+        if self.match.mode == "player_cpu":
             p1_col, p2_col = C.PLAYER_C, C.CPU_C
-        elif self.mode == "two_players":
+        elif self.match.mode == "two_players":
             p1_col, p2_col = C.PLAYER_C, C.P2_C
         else:
             p1_col, p2_col = C.CPU_C, C.P2_C
@@ -233,7 +293,7 @@ class SumoSensorsGame:
             label = SMALL.render(f"{t_sec:6.2f} s", True, C.TXT_C)
             self.scr.blit(label,
                           (C.SCREEN_W//2 - label.get_width()//2, bar_y - 20))
-        pygame.display.flip()
+        self._present()
 
     def run(self):
         running = True
@@ -252,55 +312,87 @@ class SumoSensorsGame:
                     if e.key==pygame.K_t:
                         self.start_replay() if not self.replay_mode else setattr(self,"replay_mode",False)
                     if e.key==pygame.K_c:
-                        print("CSV guardado" if self.rec.export_csv() else "Nada que exportar")
+                        self.export_csv()
+                    if e.key==pygame.K_v:
+                        self.toggle_capture()
+                    if e.key==pygame.K_F5:
+                        self.save_snapshot()
+                    if e.key==pygame.K_F9:
+                        self.load_snapshot()
 
             if not self.replay_mode:
-                if not self.game_over:
-                    keys = pygame.key.get_pressed()
-                    if isinstance(self.player, B.CpuBot):
-                        self.player.update(self.opponent, dt)
-                    else:
-                        self.player.update(keys, dt)
-                    if isinstance(self.opponent, B.CpuBot):
-                        self.opponent.update(self.player, dt)
-                    else:
-                        self.opponent.update(keys, dt)
-                    bots_touching = self.player.pos.distance_to(self.opponent.pos) <= C.BOT_RADIUS * 2
-                    self.player.push_apart(self.opponent)
-                    # sensores
-                    self.player.update_ir()
-                    self.opponent.update_ir()
-                    self.player.launch_ping(now, self.opponent)
-                    self.opponent.launch_ping(now, self.player)
-                    self.player.update_ping(dt)
-                    self.opponent.update_ping(dt)
-
-                    # KO cuando un bot abandona el dojo mientras es empujado
-                    if not U.within_ring_with_radius(self.player.pos) and bots_touching:
-                        if self.mode == "player_cpu":
-                            self.winner = "CPU"
-                        elif self.mode == "two_players":
-                            self.winner = "JUGADOR 2"
-                        else:
-                            self.winner = "CPU 2"
-                    if not U.within_ring_with_radius(self.opponent.pos) and bots_touching:
-                        if self.mode == "player_cpu":
-                            self.winner = "JUGADOR"
-                        elif self.mode == "two_players":
-                            self.winner = "JUGADOR 1"
+                self.match.step(dt, now, pygame.key.get_pressed())
+                if self.telemetry is not None:
+                    self.telemetry.publish(self.match, now)
+                self.draw_game(now)
+            else:
+                self.draw_replay()
+                self.replay_idx += 1
+                if self.replay_idx >= len(self.rec.frames):
+                    self.replay_mode=False
+
+        self._shutdown()
+
+    def run_threaded(self):
+        """Como ``run``, pero la simulación avanza en un ``SimThread``.
+
+        Este hilo solo atiende la entrada y dibuja la última vista publicada;
+        toda modificación de la partida se envía como mensaje al hilo de
+        simulación.
+        """
+        sim = SimThread(self)
+        sim.start()
+        running = True
+        while running:
+            self.clock.tick(60)
+            now = pygame.time.get_ticks()
+            for e in pygame.event.get():
+                if e.type == pygame.QUIT or \
+                   (e.type==pygame.KEYDOWN and e.key==pygame.K_ESCAPE):
+                    running=False
+                if e.type==pygame.KEYDOWN:
+                    if e.key==pygame.K_r:
+                        self.replay_mode = False
+                        sim.send("reset"); sim.send("resume")
+                    if e.key==pygame.K_TAB:
+                        self.replay_mode = False
+                        sim.send("mode"); sim.send("resume")
+                    if e.key==pygame.K_t:
+                        if not self.replay_mode:
+                            self.start_replay()
+                            if self.replay_mode:
+                                sim.send("pause")
                         else:
-                            self.winner = "CPU 1"
-                    if self.winner:
-                        self.game_over=True
+                            self.replay_mode = False
+                            sim.send("resume")
+                    if e.key==pygame.K_c:
+                        self.export_csv()       # desde este hilo, sin parar la física
+                    if e.key==pygame.K_v:
+                        self.toggle_capture()
+                    if e.key==pygame.K_F5:
+                        sim.send("save")
+                    if e.key==pygame.K_F9:
+                        sim.send("load")
 
-                    self.rec.add(now, self.player, self.opponent)
-                self.draw_game(now)
+            if not self.replay_mode:
+                sim.send("keys", pygame.key.get_pressed())
+                self.draw_game(now, sim.latest())
             else:
                 self.draw_replay()
                 self.replay_idx += 1
                 if self.replay_idx >= len(self.rec.frames):
                     self.replay_mode=False
+                    sim.send("resume")
+
+        sim.stop()
+        self._shutdown()
 
+    def _shutdown(self):
+        """Cierra captura y telemetría y sale."""
+        if self.capture is not None:
+            self.toggle_capture()
+        if self.telemetry is not None:
+            self.telemetry.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,191 @@
+"""
+Vista en cuadrícula para vigilar muchas partidas simultáneas.
+
+Cada partida se dibuja como una miniatura: sprite del dojo precalculado, bots
+como círculos simples y sin HUD.  Las miniaturas se refrescan por turnos con
+un máximo de ``GRID_TILES_PER_FRAME`` por frame, así que el coste de render
+no crece con el número de partidas.  Clic en una miniatura → vista completa;
+ESC o clic para volver.  ``+``/``-`` cambian el periodo de refresco.
+"""
+import sys, math, collections, pygame
+import constants as C
+import utils as U
+from match import Match, OUTCOME_KO
+from game import SumoSensorsGame, SMALL
+
+ARENA_R = C.DOJO_RADIUS + C.RING_EDGE + C.OUTER_RING_WIDTH
+STATUS_H = 24
+
+
+class GridViewer:
+    """Ejecuta ``n`` partidas y las muestra en miniatura."""
+
+    def __init__(self, n, mode="cpu_cpu", refresh_ms=C.GRID_REFRESH_MS,
+                 telemetry=None):
+        """Crea ``n`` partidas en ``mode`` refrescando cada una cada ``refresh_ms``.
+
+        Si se pasa un ``TelemetryPublisher`` se publica cada partida con su
+        índice como ``sim_id``.
+        """
+        self.game = SumoSensorsGame()
+        self.telemetry = telemetry
+        pygame.display.set_caption("Sumo-Sensors (cuadrícula)")
+        self.scr = self.game.scr
+        self.clock = self.game.clock
+        self.matches = [Match(mode, limits=True) for _ in range(n)]
+        self.refresh_ms = refresh_ms
+        self.results = collections.Counter()
+
+        self.cols = math.ceil(math.sqrt(n))
+        self.rows = math.ceil(n / self.cols)
+        gap = C.GRID_GAP
+        self.tile = min((C.SCREEN_W - gap*(self.cols+1)) // self.cols,
+                        (C.SCREEN_H - STATUS_H - gap*(self.rows+1)) // self.rows)
+        self.scale = self.tile / (2*ARENA_R)
+        self.bot_r = max(2, round(C.BOT_RADIUS * self.scale))
+        self.arena = self._make_arena()
+        self.rects = [pygame.Rect(gap + (i % self.cols)*(self.tile+gap),
+                                  gap + (i // self.cols)*(self.tile+gap),
+                                  self.tile, self.tile) for i in range(n)]
+        self.tiles = [pygame.Surface((self.tile, self.tile)) for _ in range(n)]
+        # primeros refrescos escalonados para repartir el trabajo entre frames
+        self.next_draw = [i * refresh_ms / n for i in range(n)]
+        self.ended_at = [None] * n
+        self.focus = None
+        self._cursor = 0
+        self._full_redraw = True
+
+    def _make_arena(self):
+        """Renderiza el dojo una sola vez a resolución completa y lo reduce."""
+        side = 2*ARENA_R
+        full = pygame.Surface((C.SCREEN_W, C.SCREEN_H))
+        full.blit(self.game.background, (0, 0))
+        self.game._ring(full)
+        crop = full.subsurface((C.CENTER[0]-ARENA_R, C.CENTER[1]-ARENA_R, side, side))
+        return pygame.transform.smoothscale(crop, (self.tile, self.tile))
+
+    def _to_tile(self, pos):
+        """Convierte una posición del dojo a coordenadas de miniatura."""
+        return (int((pos.x - C.CENTER[0] + ARENA_R) * self.scale),
+                int((pos.y - C.CENTER[1] + ARENA_R) * self.scale))
+
+    def _draw_tile(self, i):
+        """Redibuja la miniatura ``i`` a partir del sprite del dojo."""
+        surf, m = self.tiles[i], self.matches[i]
+        surf.blit(self.arena, (0, 0))
+        for b in (m.player, m.opponent):
+            x, y = self._to_tile(b.pos)
+            pygame.draw.circle(surf, b.colour, (x, y), self.bot_r)
+            vx, vy = U.unit_vec(b.heading_deg)
+            pygame.draw.line(surf, (255, 255, 255), (x, y),
+                             (x + vx*self.bot_r, y + vy*self.bot_r))
+        if m.game_over:
+            col = C.IMPACT_C if m.outcome == OUTCOME_KO else C.TXT_C
+            pygame.draw.rect(surf, col, surf.get_rect(), 3)
+
+    # ― bucle ―
+    def step(self, dt, now):
+        """Avanza todas las partidas y reinicia las terminadas tras una pausa."""
+        for i, m in enumerate(self.matches):
+            if not m.game_over:
+                m.step(dt)
+                if self.telemetry is not None:
+                    self.telemetry.publish(m, m.t_ms, sim_id=i)
+                if m.game_over:
+                    self.ended_at[i] = now
+                    self.results[m.winner or m.outcome] += 1
+            elif now - self.ended_at[i] >= C.GRID_RESTART_MS and i != self.focus:
+                m.reset()
+
+    def draw_grid(self, now):
+        """Refresca como mucho ``GRID_TILES_PER_FRAME`` miniaturas pendientes."""
+        n = len(self.matches)
+        dirty = []
+        if self._full_redraw:
+            self.scr.blit(self.game.background, (0, 0))
+            for i in range(n):
+                self._draw_tile(i)
+                self.next_draw[i] = now + self.refresh_ms
+            self.scr.blits(list(zip(self.tiles, self.rects)), doreturn=False)
+            dirty.append(self.scr.get_rect())
+            self._full_redraw = False
+        else:
+            drawn = 0
+            for k in range(n):
+                i = (self._cursor + k) % n
+                if now < self.next_draw[i]:
+                    continue
+                self._draw_tile(i)
+                self.next_draw[i] = now + self.refresh_ms
+                self.scr.blit(self.tiles[i], self.rects[i])
+                dirty.append(self.rects[i])
+                drawn += 1
+                if drawn >= C.GRID_TILES_PER_FRAME:
+                    self._cursor = (i + 1) % n
+                    break
+
+        status = pygame.Rect(0, C.SCREEN_H - STATUS_H, C.SCREEN_W, STATUS_H)
+        self.scr.fill(C.BG_BOTTOM_C, status)
+        summary = "  ".join(f"{k}: {v}" for k, v in self.results.most_common(4))
+        line = (f"{n} partidas  |  refresco {self.refresh_ms:.0f} ms (+/-)  |  "
+                f"{self.clock.get_fps():4.0f} fps  |  {summary}")
+        self.scr.blit(SMALL.render(line, True, C.TXT_C), (10, status.y + 5))
+        dirty.append(status)
+        pygame.display.update(dirty)
+
+    def _tile_at(self, pos):
+        """Índice de la miniatura bajo ``pos`` o ``None``."""
+        for i, r in enumerate(self.rects):
+            if r.collidepoint(pos):
+                return i
+        return None
+
+    def run(self):
+        running = True
+        while running:
+            dt  = self.clock.tick(60) * C.TIME_SCALE
+            now = pygame.time.get_ticks()
+            for e in pygame.event.get():
+                if e.type == pygame.QUIT:
+                    running = False
+                elif e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
+                    if self.focus is None:
+                        running = False
+                    else:
+                        self.focus, self._full_redraw = None, True
+                elif e.type == pygame.KEYDOWN and e.unicode in ("+", "-"):
+                    factor = 0.5 if e.unicode == "+" else 2.0
+                    self.refresh_ms = min(2000.0, max(16.0, self.refresh_ms*factor))
+                elif e.type == pygame.MOUSEBUTTONDOWN:
+                    if self.focus is None:
+                        self.focus = self._tile_at(e.pos)
+                    else:
+                        self.focus, self._full_redraw = None, True
+
+            self.step(dt, now)
+            if self.focus is None:
+                self.draw_grid(now)
+            else:
+                self.game.match = self.matches[self.focus]
+                self.game.draw_game(now)
+
+        if self.telemetry is not None:
+            self.telemetry.close()
+        pygame.quit()
+        sys.exit()
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Cuadrícula de partidas simultáneas.")
+    ap.add_argument("-n", "--matches", type=int, default=16)
+    ap.add_argument("--mode", default="cpu_cpu",
+                    choices=("player_cpu", "two_players", "cpu_cpu"))
+    ap.add_argument("--telemetry", type=int, metavar="PORT", default=None,
+                    help="publica la telemetría de todas las partidas en PORT")
+    args = ap.parse_args()
+    pub = None
+    if args.telemetry is not None:
+        from telemetry import TelemetryPublisher
+        pub = TelemetryPublisher(port=args.telemetry)
+    GridViewer(args.matches, args.mode, telemetry=pub).run()
@@ -0,0 +1,134 @@
+"""
+IMU simulada de alta frecuencia (acelerómetro 2D + giróscopo).
+
+A diferencia de ``Bot.record_accel``/``GyroscopeSimulated``, que dan una
+muestra por paso de física, aquí las muestras salen a ``rate_hz`` fijos
+interpolando entre la derivada del paso anterior y la del actual, con sesgo y
+ruido gaussiano.  En cada paso solo se anota el tramo (extremos y nº de
+muestras); las muestras se generan al leer, así que una IMU que nadie lee
+apenas cuesta.  Se guardan en buffers circulares preasignados (``array``).
+
+Cada IMU tiene su propio ``random.Random`` para el ruido: los flujos no se
+repiten ni se comparten entre bots y no alteran la secuencia de ``random``
+del juego.
+"""
+import collections, random
+from array import array
+import constants as C
+
+
+class ImuSimulated:
+    """IMU con buffers circulares de capacidad fija."""
+
+    def __init__(self, rate_hz=C.IMU_RATE_HZ, capacity=C.IMU_BUFFER,
+                 accel_noise=C.IMU_ACCEL_NOISE, gyro_noise=C.IMU_GYRO_NOISE,
+                 accel_bias=(C.IMU_ACCEL_BIAS, C.IMU_ACCEL_BIAS),
+                 gyro_bias=C.IMU_GYRO_BIAS, seed=None):
+        """Muestrea a ``rate_hz``; ruido en m/s² y °/s (desviación típica)."""
+        self.period_ms   = 1000.0 / rate_hz
+        self.capacity    = capacity
+        self.accel_noise = accel_noise
+        self.gyro_noise  = gyro_noise
+        self.accel_bias  = accel_bias
+        self.gyro_bias   = gyro_bias
+        self._rng = random.Random(seed)
+
+        self.t  = array("d", bytes(8 * capacity))
+        self.ax = array("f", bytes(4 * capacity))
+        self.ay = array("f", bytes(4 * capacity))
+        self.gz = array("f", bytes(4 * capacity))
+        self.count = 0          # muestras escritas en los buffers desde el inicio
+        self._read = 0          # cursor de ``read_new``
+        self._prev = None       # (t, vx, vy, heading) del último paso
+        self._deriv = (0.0, 0.0, 0.0)
+        self._next_t = 0.0
+        # tramos pendientes: (t primera muestra, nº muestras, t0, dt, a0x, a0y, w0,
+        #                     a1x, a1y, w1)
+        self._pending = collections.deque()
+        self._pending_n = 0
+
+    def update(self, t_ms, vel, heading_deg):
+        """Anota el tramo ``(t_anterior, t_ms]``; sus muestras se generan al leer."""
+        if self._prev is None or t_ms <= self._prev[0]:
+            # primer paso o el tiempo ha retrocedido (p. ej. instantánea restaurada)
+            self._prev = (t_ms, vel.x, vel.y, heading_deg)
+            self._deriv = (0.0, 0.0, 0.0)
+            self._next_t = t_ms + self.period_ms
+            return
+        t0, vx0, vy0, h0 = self._prev
+        dt_ms = t_ms - t0
+        inv_s = 1000.0 / dt_ms
+        a1x = (vel.x - vx0) * inv_s * C.ACCEL_PX_TO_MSS
+        a1y = (vel.y - vy0) * inv_s * C.ACCEL_PX_TO_MSS
+        w1  = ((heading_deg - h0 + 540) % 360 - 180) * inv_s
+
+        ts = self._next_t
+        if ts <= t_ms:
+            n = int((t_ms - ts) // self.period_ms) + 1
+            self._pending.append((ts, n, t0, dt_ms, *self._deriv, a1x, a1y, w1))
+            self._pending_n += n
+            self._next_t = ts + n * self.period_ms
+            # lo que no cabe en el buffer se sobrescribiría antes de leerse
+            while self._pending_n - self._pending[0][1] >= self.capacity:
+                dropped = self._pending.popleft()[1]
+                self.count += dropped
+                self._pending_n -= dropped
+        self._prev = (t_ms, vel.x, vel.y, heading_deg)
+        self._deriv = (a1x, a1y, w1)
+
+    def _generate(self):
+        """Escribe en los buffers las muestras de los tramos pendientes."""
+        bx, by = self.accel_bias
+        bw = self.gyro_bias
+        na, ng = self.accel_noise, self.gyro_noise
+        gauss = self._rng.gauss
+        cap, period = self.capacity, self.period_ms
+        t_buf, ax_buf, ay_buf, gz_buf = self.t, self.ax, self.ay, self.gz
+        count = self.count
+        for ts, n, t0, dt_ms, a0x, a0y, w0, a1x, a1y, w1 in self._pending:
+            dax, day, dw = a1x - a0x, a1y - a0y, w1 - w0
+            for j in range(n):
+                tj = ts + j*period
+                f = (tj - t0) / dt_ms
+                i = count % cap
+                t_buf[i]  = tj
+                ax_buf[i] = a0x + dax*f + bx + gauss(0.0, na)
+                ay_buf[i] = a0y + day*f + by + gauss(0.0, na)
+                gz_buf[i] = w0 + dw*f + bw + gauss(0.0, ng)
+                count += 1
+        self._pending.clear()
+        self._pending_n = 0
+        self.count = count
+
+    # ― lectura en bloque ―
+    def read(self, n=None):
+        """Últimas ``n`` muestras (todas las disponibles por defecto).
+
+        Devuelve ``(t, ax, ay, gz)`` como ``array`` en orden cronológico.
+        """
+        self._generate()
+        avail = min(self.count, self.capacity)
+        n = avail if n is None else min(n, avail)
+        return self._slice(self.count - n, self.count)
+
+    def read_new(self):
+        """Muestras escritas desde la última llamada y cuántas se perdieron.
+
+        Devuelve ``((t, ax, ay, gz), perdidas)``; se pierden muestras si el
+        buffer se ha dado la vuelta antes de leerlas.
+        """
+        self._generate()
+        start = max(self._read, self.count - self.capacity)
+        lost = start - self._read
+        self._read = self.count
+        return self._slice(start, self.count), lost
+
+    def _slice(self, start, stop):
+        """Copia las muestras ``[start, stop)`` (índices absolutos)."""
+        cap = self.capacity
+        a, b = start % cap, stop % cap
+        if stop - start == 0:
+            return tuple(arr[0:0] for arr in (self.t, self.ax, self.ay, self.gz))
+        if a < b:
+            return tuple(arr[a:b] for arr in (self.t, self.ax, self.ay, self.gz))
+        return tuple(arr[a:] + arr[:b] for arr in (self.t, self.ax, self.ay, self.gz))
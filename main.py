@@ -1,7 +1,12 @@
 """Punto de entrada del simulador Sumo-Sensors."""
 
+import sys
 from game import SumoSensorsGame
 
 
 if __name__ == "__main__":
-    SumoSensorsGame().run()
\ No newline at end of file
+    game = SumoSensorsGame()
+    if "--threaded" in sys.argv:
+        game.run_threaded()     # simulación y render en hilos separados
+    else:
+        game.run()
\ No newline at end of file
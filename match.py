@@ -0,0 +1,233 @@
+"""
+Partida sin render: bots, paso de física/sensores y reglas de fin de combate.
+Se usa tanto desde el juego interactivo como para lotes CPU contra CPU sin ventana.
+"""
+import collections, random
+import constants as C
+import utils as U
+import bots as B
+from imu import ImuSimulated
+from sensors import sense
+
+# Teclado "vacío" para modos sin jugador humano (cualquier tecla → no pulsada)
+NO_KEYS = collections.defaultdict(bool)
+
+# Resultados posibles de un combate
+OUTCOME_KO      = "ko"
+OUTCOME_DRAW    = "draw"
+OUTCOME_TIMEOUT = "timeout"
+
+# Nombre del ganador según el modo: (bot 1, bot 2)
+WINNER_LABELS = {
+    "player_cpu":  ("JUGADOR", "CPU"),
+    "two_players": ("JUGADOR 1", "JUGADOR 2"),
+    "cpu_cpu":     ("CPU 1", "CPU 2"),
+}
+
+
+class Match:
+    """Estado de un combate entre dos bots y reglas de terminación."""
+
+    def __init__(self, mode="player_cpu", recorder=None, imu_rate_hz=None,
+                 limits=False):
+        """Crea una partida en ``mode``; ``recorder`` es opcional.
+
+        Con ``imu_rate_hz`` cada bot lleva una ``ImuSimulated`` a esa frecuencia.
+        ``limits`` activa el tiempo máximo y los empates por falta de contacto
+        o de progreso (lotes y evaluación); el juego interactivo solo termina
+        por KO.
+        """
+        self.mode = mode
+        self.rec  = recorder
+        self.imu_rate_hz = imu_rate_hz
+        self.limits = limits
+        self.reset()
+
+    def reset(self):
+        """Coloca los bots en posición de salida y reinicia el marcador."""
+        if self.mode == "player_cpu":
+            self.player = B.PlayerBot((C.CENTER[0]-120, C.CENTER[1]), C.PLAYER_C)
+            self.opponent = B.CpuBot((C.CENTER[0]+120, C.CENTER[1]), C.CPU_C)
+        elif self.mode == "two_players":
+            self.player = B.PlayerBot((C.CENTER[0]-120, C.CENTER[1]), C.PLAYER_C)
+            self.opponent = B.Player2Bot((C.CENTER[0]+120, C.CENTER[1]), C.P2_C)
+        else:  # cpu_cpu
+            self.player = B.CpuBot((C.CENTER[0]-120, C.CENTER[1]), C.CPU_C)
+            self.opponent = B.CpuBot((C.CENTER[0]+120, C.CENTER[1]), C.P2_C)
+
+        self.player.heading_deg = 0
+        self.player.prev_heading = 0
+        self.opponent.heading_deg = 180
+        self.opponent.prev_heading = 180
+        if self.imu_rate_hz:
+            self.player.imu = ImuSimulated(self.imu_rate_hz)
+            self.opponent.imu = ImuSimulated(self.imu_rate_hz)
+        self.game_over = False
+        self.winner    = ""
+        self.outcome   = ""
+        self.reason    = ""
+        self.t_ms      = 0.0
+        self.last_contact_ms = 0.0
+        self._stall_base = None
+        if self.rec is not None:
+            self.rec.frames.clear()
+        self._sense()
+
+    # ― simulación ―
+    def step(self, dt, now=None, keys=NO_KEYS, record=True):
+        """Avanza la partida ``dt`` ms.
+
+        ``now`` es el reloj para pings y grabación; si se omite se usa el
+        tiempo simulado, lo que permite ir más rápido que el tiempo real.
+        Con ``record=False`` el paso no se graba (p. ej. para grabar a la
+        frecuencia del render aunque se simule más deprisa).
+        """
+        if self.game_over:
+            return
+        self.t_ms += dt
+        if now is None:
+            now = self.t_ms
+
+        if isinstance(self.player, B.CpuBot):
+            self.player.update(self.opponent, dt)
+        else:
+            self.player.update(keys, dt)
+        if isinstance(self.opponent, B.CpuBot):
+            # el jugador ya se ha movido en este tick: si ha cambiado de sitio,
+            # la CPU decide con su posición actual y no con la del frame anterior
+            ray = self.opponent.sensors.ray
+            if ray[3] != self.player.pos.x or ray[4] != self.player.pos.y:
+                self.opponent.sensors = sense(self.opponent, self.player, self.t_ms)
+            self.opponent.update(self.player, dt)
+        else:
+            self.opponent.update(keys, dt)
+        bots_touching = self.player.pos.distance_to(self.opponent.pos) <= C.BOT_RADIUS * 2
+        self.player.push_apart(self.opponent)
+        # sensores: una lectura por bot y tick que comparten IA, HUD y grabador
+        self._sense()
+        for b in (self.player, self.opponent):
+            if b.imu is not None:
+                b.imu.update(self.t_ms, b.vel, b.heading_deg)
+        self.player.launch_ping(now, self.opponent)
+        self.opponent.launch_ping(now, self.player)
+        self.player.update_ping(dt)
+        self.opponent.update_ping(dt)
+
+        if bots_touching:
+            self.last_contact_ms = self.t_ms
+        self._check_ko(bots_touching)
+        if self.limits and not self.outcome:
+            self._check_limits()
+        if self.outcome:
+            self.game_over = True
+
+        if record and self.rec is not None:
+            self.rec.add(now, self.player, self.opponent)
+
+    def _sense(self):
+        """Calcula el ``SensorFrame`` de ambos bots para el tick actual."""
+        self.player.sensors = sense(self.player, self.opponent, self.t_ms)
+        self.opponent.sensors = sense(self.opponent, self.player, self.t_ms)
+
+    # ― reglas de fin de combate ―
+    def _finish(self, outcome, reason, winner=""):
+        """Cierra el combate con el resultado indicado."""
+        self.outcome = outcome
+        self.reason  = reason
+        self.winner  = winner
+
+    def _check_ko(self, bots_touching):
+        """KO cuando un bot abandona el dojo empujado o agota su batería."""
+        p1_label, p2_label = WINNER_LABELS.get(self.mode, WINNER_LABELS["cpu_cpu"])
+        if bots_touching:
+            if not U.within_ring_with_radius(self.player.pos):
+                self._finish(OUTCOME_KO, "fuera del dojo", p2_label)
+            if not U.within_ring_with_radius(self.opponent.pos):
+                self._finish(OUTCOME_KO, "fuera del dojo", p1_label)
+        if self.outcome:
+            return
+        p1_dead = self.player.battery <= 0.0
+        p2_dead = self.opponent.battery <= 0.0
+        if p1_dead and p2_dead:
+            self._finish(OUTCOME_DRAW, "baterías agotadas")
+        elif p1_dead:
+            self._finish(OUTCOME_KO, "batería agotada", p2_label)
+        elif p2_dead:
+            self._finish(OUTCOME_KO, "batería agotada", p1_label)
+
+    def _check_limits(self):
+        """Tiempo máximo, ausencia de contacto y partidas sin progreso."""
+        if self.t_ms >= C.MATCH_TIME_LIMIT_MS:
+            self._finish(OUTCOME_TIMEOUT, "tiempo agotado")
+        elif self.t_ms - self.last_contact_ms >= C.NO_CONTACT_LIMIT_MS:
+            self._finish(OUTCOME_DRAW, "sin contacto")
+        elif self._stalled():
+            self._finish(OUTCOME_DRAW, "sin progreso")
+
+    def _stalled(self):
+        """¿Ambas CPU repiten su ciclo de barrido y avance sin encontrarse?
+
+        La racha cuenta mientras las dos están en ``scan``/``move`` y el rival
+        queda lejos, es decir, a más de ``STALL_FAR_PX`` (fuera del alcance
+        del sonar); se reinicia en cuanto una persigue o se acercan.  Tras
+        ``STALL_SCAN_CYCLES`` barridos completos de cada una se da por empate.
+
+        Caso con semilla en el que se dispara (``python -m doctest match.py``):
+
+        >>> import io, contextlib
+        >>> random.seed(34)
+        >>> m = Match("cpu_cpu", limits=True)
+        >>> with contextlib.redirect_stdout(io.StringIO()):
+        ...     while not m.game_over:
+        ...         m.step(C.SIM_DT_MS)
+        >>> m.reason, m.t_ms - m.last_contact_ms < C.NO_CONTACT_LIMIT_MS
+        ('sin progreso', True)
+        """
+        p, o = self.player, self.opponent
+        if not (isinstance(p, B.CpuBot) and isinstance(o, B.CpuBot)):
+            return False
+        if ("pursue" in (p.state, o.state) or
+                p.sensors.opp_dist <= C.STALL_FAR_PX):
+            self._stall_base = None
+            return False
+        if self._stall_base is None:
+            self._stall_base = (p.scan_cycles, o.scan_cycles)
+            return False
+        return min(p.scan_cycles - self._stall_base[0],
+                   o.scan_cycles - self._stall_base[1]) >= C.STALL_SCAN_CYCLES
+
+    def result(self):
+        """Resumen del combate como diccionario."""
+        return {"outcome": self.outcome, "winner": self.winner,
+                "reason": self.reason, "t_ms": self.t_ms}
+
+
+# ── Lotes sin ventana ────────────────────────────────────────────
+
+def run_batch(n, mode="cpu_cpu", dt_ms=C.SIM_DT_MS, seed=None):
+    """Juega ``n`` partidas seguidas sin render y devuelve sus resultados.
+
+    El coste de cada partida está acotado por ``MATCH_TIME_LIMIT_MS / dt_ms``
+    pasos de simulación.
+    """
+    results = []
+    for i in range(n):
+        if seed is not None:
+            random.seed(seed + i)
+        m = Match(mode, limits=True)
+        while not m.game_over:
+            m.step(dt_ms)
+        results.append(m.result())
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Lote de partidas sin ventana.")
+    ap.add_argument("-n", "--matches", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+    res = run_batch(args.matches, seed=args.seed)
+    counts = collections.Counter(r["winner"] or r["outcome"] for r in res)
+    for k, v in counts.most_common():
+        print(f"{k:12s} {v}")
@@ -12,23 +12,38 @@ class Recorder:
         self.frames = []
 
     def add(self, t_ms, p1, p2):
-        """Añade una muestra de tiempo y estado de ambos bots."""
+        """Añade una muestra de tiempo y estado de ambos bots.
+
+        Aceleración y velocidad angular salen del ``SensorFrame`` del tick;
+        ``p1push``/``p2push`` son los empujones acumulados que ha detectado
+        cada bot (``Bot.pushes``).
+        """
+        s1, s2 = p1.sensors, p2.sensors
         self.frames.append({
             "t": t_ms,
             "p1x": p1.pos.x, "p1y": p1.pos.y, "p1h": p1.heading_deg,
             "p2x": p2.pos.x, "p2y": p2.pos.y, "p2h": p2.heading_deg,
-            "p1ax": p1.accel[0], "p1ay": p1.accel[1],
-            "p2ax": p2.accel[0], "p2ay": p2.accel[1],
-            "p1w": p1.ang_vel, "p2w": p2.ang_vel,
+            "p1ax": s1.accel[0], "p1ay": s1.accel[1],
+            "p2ax": s2.accel[0], "p2ay": s2.accel[1],
+            "p1w": s1.ang_vel, "p2w": s2.ang_vel,
+            "p1push": p1.pushes, "p2push": p2.pushes,
         })
         if len(self.frames) > self.max_frames:
             self.frames.pop(0)
 
-    def export_csv(self, filename="sumo_log.csv"):
-        """Exporta los datos grabados a un archivo CSV."""
-        if not self.frames:
+    def export_csv(self, filename="sumo_log.csv", frames=None):
+        """Exporta los datos grabados (o la copia ``frames``) a un archivo CSV."""
+        frames = self.frames if frames is None else frames
+        if not frames:
             return False
         with open(filename,"w",newline="",encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=self.frames[0].keys())
-            w.writeheader(); w.writerows(self.frames)
+            w = csv.DictWriter(f, fieldnames=frames[0].keys())
+            w.writeheader(); w.writerows(frames)
         return True
+
+    def load_csv(self, filename="sumo_log.csv"):
+        """Carga un CSV exportado para reproducirlo (sin recortar a ``max_frames``)."""
+        with open(filename, newline="", encoding="utf-8") as f:
+            self.frames = [{k: float(v) for k, v in row.items()}
+                           for row in csv.DictReader(f)]
+        return len(self.frames)
@@ -0,0 +1,125 @@
+"""
+Lecturas de sensores de un tick, calculadas una sola vez por bot.
+
+``Match.step`` llama a ``sense`` tras la física de cada tick y guarda el
+resultado en ``bot.sensors``; IA, HUD, grabador y telemetría leen de ahí en
+lugar de repetir el trazado del sonar, el IR o el rumbo al rival.
+
+El sonar es perezoso: el frame guarda el rayo (posición, rumbo y rival) y lo
+traza la primera vez que alguien pide sus campos, es decir, al lanzar un ping
+o al dibujar el HUD.  El ruido de la medida tampoco se sortea hasta que se lee
+``sonar_px``, así que un lote sin render no consume números aleatorios extra.
+La distancia y el rumbo al rival y el módulo de la aceleración salen del mismo
+rayo y también se calculan al leerlos.
+"""
+import math
+import utils as U
+
+
+class SensorFrame:
+    """Instantánea de sensores de un bot en un tick."""
+
+    __slots__ = ("t", "ray", "_sonar", "_sonar_px",
+                 "ir_rho", "ir_intensity", "ir_colour",
+                 "gyro", "ang_vel", "accel", "_opp_dist", "_opp_bearing")
+
+    def __init__(self, t, ray, ir_rho, ir_intensity, ir_colour, gyro, ang_vel,
+                 accel, sonar_px=None):
+        self.t             = t
+        self.ray           = ray              # (x, y, rumbo, x rival, y rival)
+        self._sonar        = None             # (real, impacto, fuente) al trazar
+        self._sonar_px     = sonar_px         # medida con ruido, al leerla
+        self.ir_rho        = ir_rho
+        self.ir_intensity  = ir_intensity
+        self.ir_colour     = ir_colour
+        self.gyro          = gyro             # °/s según el giróscopo
+        self.ang_vel       = ang_vel          # °/s por diferencias finitas
+        self.accel         = accel            # (ax, ay) en m/s²
+        self._opp_dist     = None
+        self._opp_bearing  = None             # (absoluto, relativo) al leerlo
+
+    def _trace(self):
+        if self._sonar is None:
+            x, y, heading, ox, oy = self.ray
+            self._sonar = U.sonar_trace((x, y), heading, (ox, oy))
+        return self._sonar
+
+    @property
+    def sonar_real_px(self):
+        """Distancia exacta al obstáculo del sonar."""
+        return self._trace()[0]
+
+    @property
+    def sonar_hit(self):
+        """Punto de impacto del sonar."""
+        return self._trace()[1]
+
+    @property
+    def sonar_src(self):
+        """``"ring"`` o ``"bot"``."""
+        return self._trace()[2]
+
+    @property
+    def sonar_px(self):
+        """Distancia medida (con ruido); se sortea una vez por frame."""
+        if self._sonar_px is None:
+            self._sonar_px = U.sonar_measure(self.sonar_real_px)
+        return self._sonar_px
+
+    def resolve(self):
+        """Traza el sonar y sortea su medida ya; devuelve el propio frame.
+
+        Para entregar el frame a otro hilo: después solo se leen valores
+        guardados y ese hilo no toca ``random``.
+        """
+        self.sonar_px
+        return self
+
+    @property
+    def accel_mag(self):
+        """Módulo de la aceleración (m/s²)."""
+        return math.hypot(*self.accel)
+
+    @property
+    def opp_dist(self):
+        """px al centro del rival."""
+        if self._opp_dist is None:
+            x, y, _, ox, oy = self.ray
+            self._opp_dist = math.hypot(ox - x, oy - y)
+        return self._opp_dist
+
+    def _bearing(self):
+        if self._opp_bearing is None:
+            x, y, heading, ox, oy = self.ray
+            bearing = math.degrees(math.atan2(oy - y, ox - x)) % 360
+            self._opp_bearing = (bearing, (bearing - heading + 540) % 360 - 180)
+        return self._opp_bearing
+
+    @property
+    def opp_bearing(self):
+        """Rumbo absoluto al rival (°)."""
+        return self._bearing()[0]
+
+    @property
+    def opp_diff(self):
+        """Rumbo relativo al rival, en (-180, 180]."""
+        return self._bearing()[1]
+
+
+def sense(bot, opponent, t_ms):
+    """Calcula las lecturas de ``bot`` frente a ``opponent`` en ``t_ms``.
+
+    Actualiza además los campos IR del propio bot, que siguen siendo su
+    estado publicado.  El IR solo depende de la posición, así que no se
+    recalcula si el bot no se ha movido desde su frame anterior (una CPU
+    que barre gira sobre sí misma).
+    """
+    prev = bot.sensors
+    if prev is None or prev.ray[0] != bot.pos.x or prev.ray[1] != bot.pos.y:
+        bot.update_ir()
+    return SensorFrame(t_ms,
+                       (bot.pos.x, bot.pos.y, bot.heading_deg,
+                        opponent.pos.x, opponent.pos.y),
+                       bot.ir_rho, bot.ir_intensity, bot.ir_colour,
+                       bot.gyroscope.read_angular_velocity(), bot.ang_vel,
+                       bot.accel)
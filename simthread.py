@@ -0,0 +1,125 @@
+"""
+Simulación en un hilo propio con estado publicado en doble buffer.
+
+``SimThread`` avanza la partida a ``SIM_RATE_HZ`` fijos y, tras cada tanda de
+pasos, publica una vista inmutable (``MatchView``) en el buffer trasero y lo
+intercambia con el delantero.  El hilo principal solo lee la vista delantera
+para dibujar, así que un HUD lento no retrasa la física.  La entrada llega por
+un ``deque`` (``append``/``popleft`` son atómicos, sin cerrojos).
+
+Los pings y el grabador usan la misma base de tiempo que ``run``: el reloj de
+``pygame.time.get_ticks`` (tiempo real) y una muestra por frame de render.
+"""
+import collections, threading, time
+import pygame
+from pygame.math import Vector2
+import constants as C
+from match import NO_KEYS
+
+PingView  = collections.namedtuple(
+    "PingView", "origin dir_det out echo echo_dir hit_pt target_src")
+BotView   = collections.namedtuple(
+    "BotView", "pos heading_deg colour accel battery ping sensors")
+MatchView = collections.namedtuple(
+    "MatchView", "t_ms mode player opponent game_over outcome winner reason")
+
+
+def bot_view(b):
+    """Copia inmutable de lo que el render necesita de un bot."""
+    p = b.ping
+    ping = None if p is None else PingView(p.origin, p.dir_det, p.out, p.echo,
+                                           p.echo_dir, p.hit_pt, p.target_src)
+    # ``sensors`` se crea nuevo en cada tick y se comparte, pero es perezoso:
+    # el sonar que lee el HUD se resuelve aquí, en el hilo de simulación, para
+    # que el render no sortee su ruido con el ``random`` global (F5/F9)
+    return BotView(Vector2(b.pos), b.heading_deg, b.colour, b.accel,
+                   b.battery, ping, b.sensors.resolve())
+
+
+def match_view(m):
+    """Copia inmutable del estado de ``m`` para dibujarlo."""
+    return MatchView(m.t_ms, m.mode, bot_view(m.player), bot_view(m.opponent),
+                     m.game_over, m.outcome, m.winner, m.reason)
+
+
+class SimThread(threading.Thread):
+    """Hilo que simula la partida de ``game`` a paso fijo."""
+
+    def __init__(self, game):
+        super().__init__(daemon=True, name="sumo-sim")
+        self.game    = game
+        self.inbox   = collections.deque()
+        self.running = True
+        self.paused  = False
+        self._keys   = NO_KEYS
+        self._slots  = [None, None]
+        self._front  = 0
+        self._publish()
+
+    # ― hilo principal ―
+    def send(self, *msg):
+        """Encola un mensaje (``("keys", estado)`` o un comando) sin bloquear."""
+        self.inbox.append(msg)
+
+    def latest(self):
+        """Última vista publicada."""
+        return self._slots[self._front]
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    # ― hilo de simulación ―
+    def _publish(self):
+        back = 1 - self._front
+        self._slots[back] = match_view(self.game.match)
+        self._front = back
+
+    def _drain(self):
+        """Aplica la entrada pendiente; solo este hilo toca la partida."""
+        g = self.game
+        while self.inbox:
+            cmd, *args = self.inbox.popleft()
+            if cmd == "keys":
+                self._keys = args[0]
+            elif cmd == "reset":
+                g.match.reset()
+            elif cmd == "mode":
+                g.cycle_mode()
+            elif cmd == "pause":
+                self.paused = True
+            elif cmd == "resume":
+                self.paused = False
+            elif cmd == "save":
+                g.save_snapshot()
+            elif cmd == "load":
+                g.load_snapshot()
+
+    def run(self):
+        period = 1.0 / C.SIM_RATE_HZ
+        dt = 1000.0 * period * C.TIME_SCALE
+        # ``run`` graba un frame por cada render a 60 fps
+        rec_every = max(1, round(C.SIM_RATE_HZ / 60))
+        g = self.game
+        next_t = start = time.perf_counter()
+        ticks0 = pygame.time.get_ticks()
+        n = 0
+        while self.running:
+            self._drain()
+            now = time.perf_counter()
+            steps = 0
+            while next_t <= now and steps < C.SIM_MAX_CATCHUP:
+                if not self.paused:
+                    # instante nominal del paso en el reloj de ``get_ticks``
+                    wall = ticks0 + (next_t - start) * 1000.0
+                    g.match.step(dt, wall, self._keys, record=n % rec_every == 0)
+                    if g.telemetry is not None:
+                        g.telemetry.publish(g.match, wall)
+                    n += 1
+                next_t += period
+                steps += 1
+            if steps == C.SIM_MAX_CATCHUP:
+                next_t = now        # demasiado atrasado: se descarta el retraso
+            if steps:
+                self._publish()
+            time.sleep(max(0.0, next_t - time.perf_counter()))
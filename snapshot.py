@@ -0,0 +1,205 @@
+"""
+Instantáneas binarias de una partida completa para ramificar simulaciones.
+
+Una instantánea guarda todo lo que influye en la evolución del combate: campos
+de ambos bots, ping en vuelo, giróscopo, ``SensorFrame`` del último tick (la IA decide con
+él), estado de la IA de las CPU, marcador
+de ``Match`` y el estado del generador global ``random``.  No incluye el
+historial del ``Recorder`` (es salida, no estado) ni las ``ImuSimulated``,
+que solo observan y se resincronizan solas al cambiar el tiempo.  Se
+empaqueta con ``struct`` en ~3 KB y tomarla o restaurarla cuesta
+microsegundos.
+"""
+import math, random, struct
+from concurrent.futures import ProcessPoolExecutor
+import constants as C
+import bots as B
+from match import Match
+from sensors import SensorFrame
+
+MAGIC   = b"SSNP"
+VERSION = 6
+
+MODES      = ("player_cpu", "two_players", "cpu_cpu")
+IR_COLOURS = ("negro", "blanco", "azul")
+CPU_STATES = ("scan", "move", "pursue")
+PING_SRCS  = ("ring", "bot")
+
+# cabecera: magic, versión, modo, game_over, ¿hay base de estancamiento?, t,
+#           último contacto, base de estancamiento (barridos de cada CPU)
+_HEAD  = struct.Struct("<4sBBBB2d2I")
+# bot: pos, heading, vel, prev_vel, ¿prev_vel is vel?, last_ping, accel, accel_time,
+#      ang_vel, prev_heading, giróscopo (ω, θ), IR (I, ρ, d, color), batería,
+#      batería máx., empujones
+_BOT   = struct.Struct("<3d2d2dBd2dqdd2d3dB2dI")
+# ping: ¿existe?, origen, dirección, distancia, impacto, fuente, out, echo, echo_dir
+_PING  = struct.Struct("<B2ddd2dBddd")
+# SensorFrame: t, rayo del sonar (x, y, rumbo, rival), medida (nan si no se ha
+#              leído), IR (ρ, I, color), giróscopo, ω, aceleración; lo relativo
+#              al rival se recalcula del rayo
+_SENS  = struct.Struct("<d5d3dB2d2d")
+# IA de CPU: estado, scan_rot, move_time, scan_cycles
+_CPU   = struct.Struct("<BddI")
+_RNG   = struct.Struct("<B625IBd")
+_STR   = struct.Struct("<B")
+
+
+def _pack_str(s):
+    raw = s.encode("utf-8")
+    return _STR.pack(len(raw)) + raw
+
+
+def _unpack_str(blob, off):
+    n, = _STR.unpack_from(blob, off)
+    off += _STR.size
+    return blob[off:off+n].decode("utf-8"), off + n
+
+
+def _pack_bot(b):
+    """Empaqueta un bot (y su ping/IA si los tiene)."""
+    out = _BOT.pack(b.pos.x, b.pos.y, b.heading_deg,
+                    b.vel.x, b.vel.y, b.prev_vel.x, b.prev_vel.y,
+                    b.prev_vel is b.vel, b.last_ping_ms,
+                    b.accel[0], b.accel[1], b.accel_time,
+                    b.ang_vel, b.prev_heading,
+                    b.gyroscope.angular_velocity, b.gyroscope.orientation,
+                    b.ir_intensity, b.ir_rho, b.ir_dist_cm,
+                    IR_COLOURS.index(b.ir_colour),
+                    b.battery, b.max_battery, b.pushes)
+    p = b.ping
+    if p is None:
+        out += _PING.pack(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    else:
+        out += _PING.pack(1, *p.origin, p.dir_det, p.target_d, *p.hit_pt,
+                          PING_SRCS.index(p.target_src), p.out, p.echo,
+                          math.nan if p.echo_dir is None else p.echo_dir)
+    f = b.sensors
+    # la medida se guarda solo si ya se sorteó: tomar la instantánea no debe
+    # consumir números aleatorios
+    out += _SENS.pack(f.t, *f.ray, math.nan if f._sonar_px is None else f._sonar_px,
+                      f.ir_rho, f.ir_intensity, IR_COLOURS.index(f.ir_colour),
+                      f.gyro, f.ang_vel, *f.accel)
+    if isinstance(b, B.CpuBot):
+        out += _CPU.pack(CPU_STATES.index(b.state), b.scan_rot, b.move_time,
+                         b.scan_cycles)
+    return out
+
+
+def _unpack_bot(b, blob, off):
+    """Restaura un bot en sitio y devuelve el nuevo desplazamiento."""
+    (px, py, b.heading_deg, vx, vy, pvx, pvy, alias, b.last_ping_ms,
+     ax, ay, b.accel_time, b.ang_vel, b.prev_heading,
+     b.gyroscope.angular_velocity, b.gyroscope.orientation,
+     b.ir_intensity, b.ir_rho, b.ir_dist_cm, ir_c,
+     b.battery, b.max_battery, b.pushes) = _BOT.unpack_from(blob, off)
+    off += _BOT.size
+    b.pos.xy = (px, py)
+    b.vel = B.Vector2(vx, vy)
+    b.prev_vel = b.vel if alias else B.Vector2(pvx, pvy)
+    b.accel = (ax, ay)
+    b.ir_colour = IR_COLOURS[ir_c]
+
+    (has, ox, oy, det, dist, hx, hy, src, out, echo,
+     echo_dir) = _PING.unpack_from(blob, off)
+    off += _PING.size
+    b.ping = None
+    if has:
+        b.ping = B.Ping((ox, oy), det, dist, (hx, hy), PING_SRCS[src])
+        b.ping.out, b.ping.echo = out, echo
+        b.ping.echo_dir = None if math.isnan(echo_dir) else echo_dir
+
+    (t, rx, ry, rh, rox, roy, sonar, rho, inten, ir_c, gyro, w, ax,
+     ay) = _SENS.unpack_from(blob, off)
+    off += _SENS.size
+    b.sensors = SensorFrame(t, (rx, ry, rh, rox, roy), rho, inten, IR_COLOURS[ir_c],
+                            gyro, w, (ax, ay), None if math.isnan(sonar) else sonar)
+
+    if isinstance(b, B.CpuBot):
+        st, b.scan_rot, b.move_time, b.scan_cycles = _CPU.unpack_from(blob, off)
+        b.state = CPU_STATES[st]
+        off += _CPU.size
+    return off
+
+
+def take(match, include_rng=True):
+    """Devuelve la instantánea binaria de ``match``."""
+    stall = match._stall_base
+    out = _HEAD.pack(MAGIC, VERSION, MODES.index(match.mode), match.game_over,
+                     stall is not None, match.t_ms, match.last_contact_ms,
+                     *(stall or (0, 0)))
+    out += _pack_str(match.winner) + _pack_str(match.outcome) + _pack_str(match.reason)
+    out += _pack_bot(match.player) + _pack_bot(match.opponent)
+    if include_rng:
+        version, internal, gauss = random.getstate()
+        out += _RNG.pack(version, *internal, gauss is not None, gauss or 0.0)
+    return out
+
+
+def restore(blob, match=None, limits=False):
+    """Reconstruye la partida de ``blob``.
+
+    Si se pasa ``match`` se restaura sobre él reutilizando sus objetos; si su
+    modo no coincide, se cambia y se reinicia antes (conserva ``Recorder``,
+    IMU y límites).  Sin ``match`` se crea una partida nueva sin ``Recorder``
+    y con ``limits``.  Si la instantánea incluye el estado de ``random``
+    también se restaura.
+    """
+    (magic, version, mode, game_over, has_stall, t_ms, last_contact,
+     *stall) = _HEAD.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("instantánea no reconocida")
+    mode = MODES[mode]
+    if match is None or match.mode != mode:
+        state = random.getstate()
+        if match is None:
+            match = Match(mode, limits=limits)
+        else:
+            match.mode = mode
+            match.reset()
+        random.setstate(state)          # reset() consume números aleatorios
+    match.game_over = bool(game_over)
+    match.t_ms, match.last_contact_ms = t_ms, last_contact
+    match._stall_base = tuple(stall) if has_stall else None
+    off = _HEAD.size
+    match.winner, off  = _unpack_str(blob, off)
+    match.outcome, off = _unpack_str(blob, off)
+    match.reason, off  = _unpack_str(blob, off)
+    off = _unpack_bot(match.player, blob, off)
+    off = _unpack_bot(match.opponent, blob, off)
+    if off < len(blob):
+        version, *internal, has_gauss, gauss = _RNG.unpack_from(blob, off)
+        random.setstate((version, tuple(internal), gauss if has_gauss else None))
+    return match
+
+
+# ── Ramas en paralelo ────────────────────────────────────────────
+
+def _run_branch(blob, idx, seed, max_ms, dt_ms, mutate):
+    """Ejecuta una rama hasta el final (o ``max_ms``) y devuelve su resultado."""
+    m = restore(blob, limits=True)
+    if seed is not None:
+        random.seed(seed + idx)
+    if mutate is not None:
+        mutate(m, idx)
+    limit = m.t_ms + max_ms
+    while not m.game_over and m.t_ms < limit:
+        m.step(dt_ms)
+    res = m.result()
+    res["branch"] = idx
+    return res
+
+
+def run_branches(blob, n, seed=0, max_ms=C.MATCH_TIME_LIMIT_MS,
+                 dt_ms=C.SIM_DT_MS, mutate=None, workers=None):
+    """Lanza ``n`` continuaciones de la misma instantánea en procesos aparte.
+
+    Cada rama se resiembra con ``seed + índice`` (``seed=None`` mantiene el
+    estado aleatorio guardado, es decir, ramas idénticas salvo ``mutate``).
+    ``mutate(match, idx)`` permite forzar decisiones, p. ej. girar a la
+    izquierda; debe ser una función de módulo para poder enviarse a otros
+    procesos.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futs = [ex.submit(_run_branch, blob, i, seed, max_ms, dt_ms, mutate)
+                for i in range(n)]
+        return [f.result() for f in futs]
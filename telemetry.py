@@ -0,0 +1,262 @@
+"""
+Publicación de telemetría en vivo por socket TCP local.
+
+Cada mensaje agrupa varios frames y eventos en binario little-endian:
+
+    cabecera  <I4sBHH   longitud total, b"SUMO", versión, nº frames, nº eventos
+    frame     <Hd20f    sim_id, t (ms) y 10 valores por bot (ver ``BOT_FIELDS``)
+    evento    <HdBB     sim_id, t (ms), código (``EV_*``) y bot (0, 1 o 255)
+
+Un lote se cierra al llenarse, al terminar una partida o cuando su primer dato
+lleva ``TELEMETRY_FLUSH_MS`` esperando (reloj de pared, comprobado en cada
+``publish``).  El bucle de simulación solo empaqueta bytes: el envío lo hace
+un hilo aparte
+y cada suscriptor tiene una cola acotada en la que se descartan los mensajes
+más antiguos si no lee a tiempo, así que un cliente lento nunca frena la
+simulación.
+"""
+import collections, math, selectors, socket, struct, threading, time
+import constants as C
+from match import WINNER_LABELS
+
+VERSION = 1
+HEADER = struct.Struct("<I4sBHH")
+FRAME  = struct.Struct("<Hd20f")
+EVENT  = struct.Struct("<HdBB")
+
+BOT_FIELDS = ("x", "y", "h", "ax", "ay", "w",
+              "sonar_cm", "ir", "gyro", "battery")
+
+EV_PING, EV_CONTACT_ON, EV_CONTACT_OFF, EV_PUSH, EV_END = 1, 2, 3, 4, 5
+NO_BOT = 255
+
+
+def _bot_values(bot):
+    """Valores de ``BOT_FIELDS`` para un bot, leídos de su ``SensorFrame``.
+
+    El sonar es la distancia del ping en vuelo (``nan`` sin ping): leer la
+    del frame obligaría a trazarlo y sortear su ruido en cada envío.
+    """
+    s = bot.sensors
+    sonar = bot.ping.target_d / C.PX_PER_CM if bot.ping else math.nan
+    return (bot.pos.x, bot.pos.y, bot.heading_deg,
+            s.accel[0], s.accel[1], s.ang_vel,
+            sonar, s.ir_intensity, s.gyro, bot.battery)
+
+
+class _SimState:
+    """Último estado visto de una partida, para detectar eventos."""
+
+    __slots__ = ("bots", "t_ms", "frame_idx", "last_ping", "pushes",
+                 "touching", "game_over")
+
+    def __init__(self, match):
+        self.bots      = (match.player, match.opponent)
+        self.t_ms      = match.t_ms
+        self.frame_idx = 0
+        self.last_ping = [b.last_ping_ms for b in (match.player, match.opponent)]
+        self.pushes    = [b.pushes for b in (match.player, match.opponent)]
+        self.touching  = False
+        self.game_over = match.game_over
+
+
+class _Client:
+    """Suscriptor conectado y su cola de mensajes pendientes."""
+
+    __slots__ = ("sock", "pending", "current")
+
+    def __init__(self, sock, max_pending):
+        self.sock = sock
+        self.pending = collections.deque(maxlen=max_pending)
+        self.current = None
+
+
+class TelemetryPublisher:
+    """Servidor que publica el estado de una o varias partidas por TCP."""
+
+    def __init__(self, host="127.0.0.1", port=C.TELEMETRY_PORT,
+                 decimation=C.TELEMETRY_DECIMATION,
+                 batch_frames=C.TELEMETRY_BATCH,
+                 max_pending=C.TELEMETRY_MAX_PENDING,
+                 flush_ms=C.TELEMETRY_FLUSH_MS):
+        """Escucha en ``host:port``; publica 1 de cada ``decimation`` frames."""
+        self.decimation   = max(1, int(decimation))
+        self.batch_frames = batch_frames
+        self.max_pending  = max_pending
+        self.flush_s      = flush_ms / 1000.0
+        self._frames = bytearray()
+        self._events = bytearray()
+        self._n_frames = self._n_events = 0
+        self._batch_t0 = None       # ``time.monotonic()`` del primer dato del lote
+        self._sims = {}
+        self._clients = []
+        self._running = True
+
+        self._server = socket.create_server((host, port))
+        self._server.setblocking(False)
+        self.port = self._server.getsockname()[1]
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._server, selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    # ― lado de la simulación (no bloquea nunca) ―
+    def publish(self, match, now, sim_id=0):
+        """Registra el estado de ``match`` tras un paso de simulación."""
+        st = self._sims.get(sim_id)
+        bots = (match.player, match.opponent)
+        if (st is None or st.bots[0] is not bots[0] or st.bots[1] is not bots[1]
+                or match.t_ms < st.t_ms):
+            # partida nueva: ``reset`` crea otros bots; una instantánea restaurada
+            # hace retroceder el tiempo
+            st = self._sims[sim_id] = _SimState(match)
+        elif match.game_over and st.game_over:
+            # ya terminada: nada que añadir, pero otras partidas pueden tener
+            # datos esperando
+            if self._batch_due():
+                self.flush()
+            return
+        st.t_ms = match.t_ms
+        for i, b in enumerate(bots):
+            if b.last_ping_ms != st.last_ping[i]:
+                st.last_ping[i] = b.last_ping_ms
+                self._event(sim_id, now, EV_PING, i)
+            if b.pushes != st.pushes[i]:
+                st.pushes[i] = b.pushes
+                self._event(sim_id, now, EV_PUSH, i)
+        touching = match.player.sensors.opp_dist <= C.BOT_RADIUS * 2
+        if touching != st.touching:
+            st.touching = touching
+            self._event(sim_id, now, EV_CONTACT_ON if touching else EV_CONTACT_OFF, NO_BOT)
+        ended = match.game_over and not st.game_over
+        if ended:
+            self._event(sim_id, now, EV_END, self._winner_idx(match))
+        st.game_over = match.game_over
+
+        # el frame final se envía siempre, aunque no toque por diezmado
+        if ended or st.frame_idx % self.decimation == 0:
+            self._frames += FRAME.pack(sim_id, now, *_bot_values(bots[0]),
+                                       *_bot_values(bots[1]))
+            self._n_frames += 1
+        st.frame_idx += 1
+        if self._batch_t0 is None and (self._n_frames or self._n_events):
+            self._batch_t0 = time.monotonic()
+        # al terminar se envía ya: si nadie vuelve a publicar, el final no
+        # se quedaría esperando a que se llene el lote
+        if ended or self._n_frames >= self.batch_frames or self._batch_due():
+            self.flush()
+
+    def flush(self):
+        """Cierra el lote actual y lo encola para todos los suscriptores."""
+        if not (self._n_frames or self._n_events):
+            return
+        body = bytes(self._frames) + bytes(self._events)
+        msg = HEADER.pack(HEADER.size + len(body), b"SUMO", VERSION,
+                          self._n_frames, self._n_events) + body
+        self._frames.clear(); self._events.clear()
+        self._n_frames = self._n_events = 0
+        self._batch_t0 = None
+        for cl in tuple(self._clients):
+            cl.pending.append(msg)
+
+    def close(self):
+        """Envía lo pendiente (sin esperar a clientes lentos) y cierra el servidor."""
+        self.flush()
+        self._running = False
+        self._thread.join()
+
+    def _batch_due(self):
+        """¿Lleva el lote abierto más de ``flush_s`` segundos?"""
+        return (self._batch_t0 is not None and
+                time.monotonic() - self._batch_t0 >= self.flush_s)
+
+    def _event(self, sim_id, now, code, bot):
+        self._events += EVENT.pack(sim_id, now, code, bot)
+        self._n_events += 1
+
+    @staticmethod
+    def _winner_idx(match):
+        """0/1 según qué bot ganó, o ``NO_BOT`` si hubo empate."""
+        labels = WINNER_LABELS.get(match.mode, WINNER_LABELS["cpu_cpu"])
+        return labels.index(match.winner) if match.winner in labels else NO_BOT
+
+    # ― hilo de envío ―
+    def _serve(self):
+        """Acepta suscriptores y les envía sus colas sin bloquear."""
+        while self._running:
+            for key, _ in self._sel.select(timeout=0.02):
+                if key.fileobj is self._server:
+                    try:
+                        sock, _ = self._server.accept()
+                    except BlockingIOError:
+                        continue
+                    sock.setblocking(False)
+                    self._clients.append(_Client(sock, self.max_pending))
+            for cl in tuple(self._clients):
+                self._send(cl)
+        for cl in tuple(self._clients):
+            self._send(cl)
+            cl.sock.close()
+        self._sel.close()
+        self._server.close()
+
+    def _send(self, cl):
+        """Envía todo lo que el socket acepte sin bloquear."""
+        try:
+            while True:
+                if cl.current is None:
+                    if not cl.pending:
+                        return
+                    cl.current = memoryview(cl.pending.popleft())
+                sent = cl.sock.send(cl.current)
+                cl.current = cl.current[sent:] if sent < len(cl.current) else None
+        except BlockingIOError:
+            return
+        except OSError:
+            cl.sock.close()
+            self._clients.remove(cl)
+
+
+# ── Lado del suscriptor ──────────────────────────────────────────
+
+def decode(msg):
+    """Decodifica un mensaje completo en ``(frames, eventos)``.
+
+    Cada frame es ``(sim_id, t, bot1, bot2)`` con ``botN`` un diccionario de
+    ``BOT_FIELDS``; cada evento es ``(sim_id, t, código, bot)``.
+    """
+    _, magic, version, n_frames, n_events = HEADER.unpack_from(msg)
+    if magic != b"SUMO" or version != VERSION:
+        raise ValueError("mensaje de telemetría no reconocido")
+    frames, off = [], HEADER.size
+    for vals in FRAME.iter_unpack(msg[off:off + n_frames*FRAME.size]):
+        frames.append((vals[0], vals[1],
+                       dict(zip(BOT_FIELDS, vals[2:12])),
+                       dict(zip(BOT_FIELDS, vals[12:22]))))
+    off += n_frames*FRAME.size
+    events = list(EVENT.iter_unpack(msg[off:off + n_events*EVENT.size]))
+    return frames, events
+
+
+def subscribe(host="127.0.0.1", port=C.TELEMETRY_PORT):
+    """Se conecta a un publicador y produce ``(frames, eventos)`` por mensaje."""
+    with socket.create_connection((host, port)) as sock:
+        f = sock.makefile("rb")
+        while True:
+            head = f.read(HEADER.size)
+            if len(head) < HEADER.size:
+                return
+            size = HEADER.unpack(head)[0]
+            yield decode(head + f.read(size - HEADER.size))
+
+
+if __name__ == "__main__":
+    import sys
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else C.TELEMETRY_PORT
+    for frames, events in subscribe(port=port):
+        for ev in events:
+            print("evento", ev)
+        if frames:
+            sim_id, t, b1, b2 = frames[-1]
+            print(f"sim {sim_id} t={t:9.1f}  p1=({b1['x']:6.1f},{b1['y']:6.1f})"
+                  f"  p2=({b2['x']:6.1f},{b2['y']:6.1f})  [{len(frames)} frames]")
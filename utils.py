@@ -1,7 +1,7 @@
 """
 Funciones geométricas y de ayuda (sin dependencias de Pygame salvo Vector2).
 """
-import math
+import math, random
 from pygame.math import Vector2
 import constants as C
 
@@ -67,4 +67,27 @@ def ray_disc(origin, dir_vec, center, radius):
     c = fx*fx + fy*fy - radius*radius
     t1, t2 = _solve_quadratic(a, b, c)
     ts = [t for t in (t1, t2) if t and t > 0]
-    return min(ts) if ts else None
\ No newline at end of file
+    return min(ts) if ts else None
+
+# ── Sonar ───────────────────────────────────────────────────────
+
+def sonar_trace(origin, heading_deg, target=None):
+    """Traza el sonar desde ``origin`` hacia ``heading_deg``.
+
+    ``target`` es el centro del rival (o ``None``).  Devuelve
+    ``(real, hit_pt, src)`` con la distancia exacta, el punto de impacto y
+    ``"bot"`` o ``"ring"`` según lo que se detecte.
+    """
+    dv = unit_vec(heading_deg)
+    d_ring = ray_circle(origin, dv)
+    d_bot = None if target is None else ray_disc(origin, dv, target, C.BOT_RADIUS)
+    if d_bot is not None and d_bot < d_ring and d_bot <= C.MAX_RANGE_PX:
+        real, src = d_bot, "bot"
+    else:
+        real, src = min(d_ring, C.MAX_RANGE_PX), "ring"
+    return real, (origin[0] + dv[0]*real, origin[1] + dv[1]*real), src
+
+def sonar_measure(real):
+    """Distancia medida por el sonar: la real más ruido aleatorio."""
+    noise = random.uniform(-C.PING_NOISE_PX, C.PING_NOISE_PX)
+    return max(0.0, real + noise)